@@ -0,0 +1,295 @@
+import json
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from itertools import cycle
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from rest_framework.settings import api_settings
+
+from backend.constants import (
+    BENCHMARK_REGRESSION_TOLERANCE,
+    BENCHMARK_REQUESTS,
+    BENCHMARK_WARMUP,
+)
+from backend.performance import RequestMetrics, record_queries
+from shop.models import Category, Product, ShoppingCart
+
+
+SCENARIOS = ("products", "categories", "shopping_cart", "add_shopping_cart")
+
+
+def get_percentile(quantiles, percent):
+    return round(quantiles[percent - 1] * 1000, 3)
+
+
+def find_regressions(results, baseline, tolerance):
+    """
+    Сравнение с сохраненным результатом: рост числа запросов к БД
+    или p95 больше допуска считается регрессией.
+    """
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result["queries_per_request"] > expected["queries_per_request"]:
+            regressions.append(
+                f"{name}: запросов к БД {result['queries_per_request']}, "
+                f"было {expected['queries_per_request']}"
+            )
+        if result["p95_ms"] > expected["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p95 {result['p95_ms']} мс, "
+                f"было {expected['p95_ms']} мс"
+            )
+        if result["errors"] > expected["errors"]:
+            regressions.append(
+                f"{name}: ошибок {result['errors']}, "
+                f"было {expected['errors']}"
+            )
+    return regressions
+
+
+@contextmanager
+def restore_shopping_carts():
+    """
+    Возврат корзин к исходному состоянию после замера. Запросы
+    выполняются в autocommit, как в рабочем режиме, поэтому в замер
+    входят фиксация транзакций и ожидание блокировок, а следующие
+    замеры идут на тех же данных.
+    """
+    lines = list(ShoppingCart.objects.only("id", "amount"))
+    try:
+        yield
+    finally:
+        ShoppingCart.objects.exclude(
+            id__lte=max((line.id for line in lines), default=0)
+        ).delete()
+        ShoppingCart.objects.bulk_update(lines, ("amount",))
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет пропускную способность, задержки и число запросов к БД "
+        "основных эндпоинтов API и выводит результат в JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenario", action="append", choices=SCENARIOS,
+            help="Эндпоинт для замера, по умолчанию все.",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=BENCHMARK_REQUESTS,
+            help="Запросов на каждый эндпоинт.",
+        )
+        parser.add_argument("--warmup", type=int, default=BENCHMARK_WARMUP)
+        parser.add_argument(
+            "--no-cache", action="store_true",
+            help="Замер без кеша Django.",
+        )
+        parser.add_argument(
+            "--throttle", action="store_true",
+            help="Замер с ограничением частоты запросов, по умолчанию "
+                 "лимиты отключены, чтобы не замерять ответы 429.",
+        )
+        parser.add_argument(
+            "--threads", type=int, default=1,
+            help="Потоков, одновременно выполняющих запросы, каждый "
+                 "со своим соединением с БД.",
+        )
+        parser.add_argument(
+            "--output", help="Сохранить результат в файл."
+        )
+        parser.add_argument(
+            "--baseline",
+            help="Файл с прошлым результатом для сравнения.",
+        )
+        parser.add_argument(
+            "--tolerance", type=float, default=BENCHMARK_REGRESSION_TOLERANCE,
+            help="Допустимый рост p95 относительно baseline.",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 2:
+            raise CommandError("--requests должен быть не меньше 2.")
+        if options["threads"] < 1:
+            raise CommandError("--threads должен быть не меньше 1.")
+        if (
+            options["threads"] > 1 and connection.vendor == "sqlite"
+            and connection.is_in_memory_db()
+        ):
+            raise CommandError("--threads требует БД SQLite в файле.")
+        overrides = {"ALLOWED_HOSTS": [*settings.ALLOWED_HOSTS, "testserver"]}
+        if options["no_cache"]:
+            overrides["CACHES"] = {"default": {
+                "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+            }}
+        if not options["throttle"]:
+            overrides["REST_FRAMEWORK"] = {
+                **settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {}
+            }
+        scenarios = options["scenario"] or SCENARIOS
+        results = {}
+        with override_settings(**overrides):
+            for name in scenarios:
+                with restore_shopping_carts():
+                    results[name] = self.run(
+                        getattr(self, f"get_{name}_requests")(),
+                        options["requests"], options["warmup"],
+                        options["threads"],
+                    )
+        report = {
+            "options": {
+                "requests": options["requests"],
+                "warmup": options["warmup"],
+                "no_cache": options["no_cache"],
+                "throttle": options["throttle"],
+                "threads": options["threads"],
+            },
+            "endpoints": results,
+        }
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output + "\n")
+        self.stdout.write(output)
+        if options["baseline"]:
+            self.compare(report, options["baseline"], options["tolerance"])
+
+    def compare(self, report, path, tolerance):
+        with open(path, encoding="utf-8") as file:
+            baseline = json.load(file)
+        # Доля попаданий в кеш зависит от числа запросов и прогрева,
+        # поэтому сравниваются только замеры с теми же параметрами.
+        if baseline["options"] != report["options"]:
+            raise CommandError(
+                f"Параметры замера {report['options']} отличаются "
+                f"от baseline {baseline['options']}."
+            )
+        regressions = find_regressions(
+            report["endpoints"], baseline["endpoints"], tolerance
+        )
+        if regressions:
+            raise CommandError(
+                "Регрессия производительности:\n" + "\n".join(regressions)
+            )
+        self.stderr.write(self.style.SUCCESS("Регрессий не найдено."))
+
+    def run(self, requests, count, warmup, threads):
+        """
+        Выполняет запросы по очереди или в threads потоках и собирает
+        статистику. Ошибки БД, например "database is locked" в SQLite,
+        считаются ответами 500, а не прерывают замер.
+        """
+        client = Client(raise_request_exception=False)
+        for _ in range(warmup):
+            self.send(client, next(requests))
+        batch = [next(requests) for _ in range(count)]
+        timings = []
+        statuses = []
+        metrics = []
+
+        def send_requests(requests):
+            client = Client(raise_request_exception=False)
+            # Запросы ко всем БД без ограничения журнала запросов Django.
+            with record_queries(RequestMetrics()) as thread_metrics:
+                for request in requests:
+                    request_started = time.perf_counter()
+                    response = self.send(client, request)
+                    timings.append(time.perf_counter() - request_started)
+                    statuses.append(response.status_code)
+            metrics.append(thread_metrics)
+
+        def run_thread(requests):
+            try:
+                send_requests(requests)
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        if threads == 1:
+            send_requests(batch)
+        else:
+            workers = [
+                threading.Thread(
+                    target=run_thread, args=(batch[start::threads],)
+                )
+                for start in range(threads)
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        elapsed = time.perf_counter() - started
+        quantiles = statistics.quantiles(timings, n=100, method="inclusive")
+        return {
+            "requests": count,
+            "throughput_rps": round(count / elapsed, 1),
+            "p50_ms": get_percentile(quantiles, 50),
+            "p95_ms": get_percentile(quantiles, 95),
+            "p99_ms": get_percentile(quantiles, 99),
+            "queries_per_request": round(
+                sum(thread.queries for thread in metrics) / count, 2
+            ),
+            "errors": sum(status >= 400 for status in statuses),
+        }
+
+    def send(self, client, request):
+        method, path, token, data = request
+        kwargs = {}
+        if token:
+            kwargs["headers"] = {"Authorization": f"Token {token}"}
+        if data is not None:
+            kwargs.update(data=data, content_type="application/json")
+        return getattr(client, method)(path, **kwargs)
+
+    def get_products_requests(self):
+        pages = max(
+            -(-Product.objects.count() // api_settings.PAGE_SIZE), 1
+        )
+        return cycle(
+            ("get", f"/api/products/?page={page}", None, None)
+            for page in range(1, pages + 1)
+        )
+
+    def get_categories_requests(self):
+        if not Category.objects.exists():
+            raise CommandError(
+                "Каталог пуст, заполните его командой seed_catalog."
+            )
+        return cycle((("get", "/api/categories/", None, None),))
+
+    def get_cart_lines(self):
+        lines = list(
+            ShoppingCart.objects.filter(user__auth_token__isnull=False)
+            .values_list("user__auth_token__key", "product_id")
+            .order_by("id")
+        )
+        if not lines:
+            raise CommandError(
+                "Нет корзин пользователей с токенами, заполните БД "
+                "командой seed_catalog."
+            )
+        return lines
+
+    def get_shopping_cart_requests(self):
+        tokens = dict.fromkeys(token for token, _ in self.get_cart_lines())
+        return cycle(
+            ("get", "/api/products/shopping_cart/", token, None)
+            for token in tokens
+        )
+
+    def get_add_shopping_cart_requests(self):
+        return cycle(
+            (
+                "patch", f"/api/products/{product}/add_shopping_cart/",
+                token, {"amount": "+"},
+            )
+            for token, product in self.get_cart_lines()
+        )
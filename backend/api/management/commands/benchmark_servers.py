@@ -0,0 +1,251 @@
+import asyncio
+import importlib.util
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from .benchmark_api import get_percentile
+from backend.constants import (
+    BENCHMARK_SERVER_CONNECTIONS,
+    BENCHMARK_SERVER_DURATION,
+    BENCHMARK_SERVER_START_TIMEOUT,
+    BENCHMARK_SERVER_THREADS,
+    BENCHMARK_SERVER_WARMUP,
+)
+
+
+SERVERS = ("wsgi", "asgi")
+SERVER_PACKAGES = {"wsgi": "gunicorn", "asgi": "uvicorn"}
+
+
+def get_server_command(server, host, port, workers, threads):
+    """Запуск gunicorn с потоками для WSGI или uvicorn для ASGI."""
+    if server == "wsgi":
+        return (
+            sys.executable, "-m", "gunicorn", "backend.wsgi:application",
+            "--bind", f"{host}:{port}", "--workers", str(workers),
+            "--worker-class", "gthread", "--threads", str(threads),
+        )
+    return (
+        sys.executable, "-m", "uvicorn", "backend.asgi:application",
+        "--host", host, "--port", str(port), "--workers", str(workers),
+        "--no-access-log",
+    )
+
+
+def get_free_port(host):
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+async def read_response(reader):
+    """
+    Чтение ответа HTTP/1.1: код ответа и нужно ли закрыть соединение.
+    Тело читается по Content-Length, по частям или до закрытия.
+    """
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("Сервер закрыл соединение.")
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip().lower()
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if not size:
+                break
+    else:
+        await reader.read()
+        return status, True
+    return status, headers.get("connection") == "close"
+
+
+async def run_connection(host, port, request, deadline, timings, errors):
+    """Запросы по одному keep-alive соединению до истечения deadline."""
+    writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            started = time.perf_counter()
+            writer.write(request)
+            status, close = await read_response(reader)
+            timings.append(time.perf_counter() - started)
+            if status >= 400:
+                errors.append(status)
+        except (OSError, ValueError, asyncio.IncompleteReadError) as error:
+            errors.append(type(error).__name__)
+            close = True
+        if close and writer is not None:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(host, port, path, connections, duration):
+    """Нагрузка из connections одновременных соединений."""
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: {host}\r\n"
+        "Accept: application/json\r\n\r\n"
+    ).encode()
+    timings, errors = [], []
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        run_connection(host, port, request, deadline, timings, errors)
+        for _ in range(connections)
+    ))
+    return timings, errors, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает синхронный API под WSGI-сервером (gunicorn) "
+        "и асинхронный под ASGI-сервером (uvicorn) при большом числе "
+        "одновременных соединений и выводит результат в JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--server", action="append", choices=SERVERS,
+            help="Сервер для замера, по умолчанию оба.",
+        )
+        parser.add_argument(
+            "--connections", type=int, default=BENCHMARK_SERVER_CONNECTIONS,
+            help="Одновременных keep-alive соединений.",
+        )
+        parser.add_argument(
+            "--duration", type=float, default=BENCHMARK_SERVER_DURATION,
+            help="Длительность замера в секундах.",
+        )
+        parser.add_argument(
+            "--warmup", type=float, default=BENCHMARK_SERVER_WARMUP,
+            help="Прогрев в секундах, его запросы не учитываются.",
+        )
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument(
+            "--threads", type=int, default=BENCHMARK_SERVER_THREADS,
+            help="Потоков в каждом процессе gunicorn.",
+        )
+        parser.add_argument(
+            "--wsgi-path", default="/api/products/",
+            help="Адрес, запрашиваемый у WSGI-сервера.",
+        )
+        parser.add_argument(
+            "--asgi-path", default="/api/async/products/",
+            help="Адрес, запрашиваемый у ASGI-сервера.",
+        )
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument(
+            "--output", help="Сохранить результат в файл."
+        )
+
+    def handle(self, *args, **options):
+        servers = options["server"] or SERVERS
+        missing = [
+            SERVER_PACKAGES[server] for server in servers
+            if importlib.util.find_spec(SERVER_PACKAGES[server]) is None
+        ]
+        if missing:
+            raise CommandError(
+                f"Не установлены пакеты: {', '.join(missing)}. "
+                f"Установите их: pip install {' '.join(missing)}"
+            )
+        results = {
+            server: self.run(server, options) for server in servers
+        }
+        report = {
+            "options": {
+                name: options[name] for name in (
+                    "connections", "duration", "warmup", "workers",
+                    "threads", "wsgi_path", "asgi_path",
+                )
+            },
+            "servers": results,
+        }
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output + "\n")
+        self.stdout.write(output)
+
+    def run(self, server, options):
+        """Запуск сервера, прогрев, замер и остановка сервера."""
+        host = options["host"]
+        port = get_free_port(host)
+        path = options[f"{server}_path"]
+        process = subprocess.Popen(
+            get_server_command(
+                server, host, port, options["workers"], options["threads"]
+            ),
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "ALLOWED_HOSTS": host},
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            self.wait_for_server(process, host, port)
+            if options["warmup"]:
+                asyncio.run(run_load(
+                    host, port, path, options["connections"],
+                    options["warmup"],
+                ))
+            timings, errors, elapsed = asyncio.run(run_load(
+                host, port, path, options["connections"],
+                options["duration"],
+            ))
+        finally:
+            process.terminate()
+            try:
+                process.wait(BENCHMARK_SERVER_START_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if len(timings) < 2:
+            raise CommandError(
+                f"{server}: сервер ответил на {len(timings)} запросов, "
+                f"ошибки: {sorted(set(map(str, errors)))}."
+            )
+        quantiles = statistics.quantiles(timings, n=100, method="inclusive")
+        return {
+            "path": path,
+            "requests": len(timings),
+            "throughput_rps": round(len(timings) / elapsed, 1),
+            "p50_ms": get_percentile(quantiles, 50),
+            "p95_ms": get_percentile(quantiles, 95),
+            "p99_ms": get_percentile(quantiles, 99),
+            "errors": len(errors),
+        }
+
+    def wait_for_server(self, process, host, port):
+        deadline = time.monotonic() + BENCHMARK_SERVER_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(
+                    f"Сервер завершился с кодом {process.returncode}: "
+                    f"{' '.join(process.args)}"
+                )
+            try:
+                socket.create_connection((host, port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.1)
+        raise CommandError(
+            f"Сервер не начал принимать соединения за "
+            f"{BENCHMARK_SERVER_START_TIMEOUT} с: {' '.join(process.args)}"
+        )
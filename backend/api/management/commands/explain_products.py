@@ -0,0 +1,90 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router, transaction
+from django.test import RequestFactory
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from api.v1.views import ProductViewSet
+from shop.cache import bump_catalog_version
+from shop.models import Product, Subcategory
+
+
+ORDERINGS = (None, "price", "-price", "name")
+PRICE_RANGE = {"price_min": 100, "price_max": 1000}
+
+
+def get_products_queryset(params):
+    """Запрос списка продуктов с фильтрами и сортировкой, как в API."""
+    request = Request(RequestFactory().get("/api/products/", params))
+    view = ProductViewSet(
+        action="list", request=request, format_kwarg=None, args=(), kwargs={}
+    )
+    return view.filter_queryset(view.get_queryset())
+
+
+class Command(BaseCommand):
+    help = (
+        "Выводит планы запросов списка продуктов для сочетаний фильтров "
+        "и сортировок, при --products - на синтетическом каталоге, "
+        "который удаляется после вывода."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--products", type=int, default=0,
+            help="Создать N продуктов командой seed_catalog перед выводом.",
+        )
+        parser.add_argument("--categories", type=int, default=10)
+        parser.add_argument(
+            "--prefix", default="explain",
+            help="Префикс слагов созданного каталога.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic(using=router.db_for_write(Product)):
+            if options["products"]:
+                call_command(
+                    "seed_catalog", products=options["products"],
+                    categories=options["categories"], images=0, users=0,
+                    cart_lines=0, prefix=options["prefix"],
+                    stdout=self.stderr,
+                )
+            self.explain()
+            transaction.set_rollback(True)
+        if options["products"]:
+            # seed_catalog сменил версию каталога, а ее запись в БД
+            # откатилась вместе с каталогом.
+            bump_catalog_version()
+
+    def explain(self):
+        subcategory = Subcategory.objects.select_related(
+            "category"
+        ).order_by("id").first()
+        if subcategory is None:
+            raise CommandError(
+                "Каталог пуст, укажите --products или заполните его "
+                "командой seed_catalog."
+            )
+        filters = (
+            {},
+            {"subcategory": subcategory.slug},
+            {"category": subcategory.category.slug},
+            PRICE_RANGE,
+            {"subcategory": subcategory.slug, **PRICE_RANGE},
+        )
+        for params in filters:
+            for ordering in ORDERINGS:
+                query_params = dict(params)
+                if ordering is not None:
+                    query_params["ordering"] = ordering
+                queryset = get_products_queryset(query_params)
+                query = "&".join(
+                    f"{name}={value}" for name, value in query_params.items()
+                )
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    f"/api/products/?{query}"
+                ))
+                self.stdout.write(
+                    queryset[:api_settings.PAGE_SIZE].explain() + "\n"
+                )
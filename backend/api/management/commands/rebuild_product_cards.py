@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.v1.cards import build_product_cards
+from shop.models import Product
+
+
+class Command(BaseCommand):
+    help = "Пересобирает карточки продуктов для ответов API."
+
+    def handle(self, *args, **options):
+        count = build_product_cards(Product.objects.all())
+        self.stdout.write(self.style.SUCCESS(
+            f"Карточки продуктов пересобраны: {count}."
+        ))
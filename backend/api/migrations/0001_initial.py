@@ -0,0 +1,27 @@
+# Generated by Django 4.2.16 on 2026-10-18 07:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('shop', '0006_product_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductCard',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='card', serialize=False, to='shop.product', verbose_name='Продукт')),
+                ('payload', models.TextField(verbose_name='Данные')),
+            ],
+            options={
+                'verbose_name': 'Карточка продукта',
+                'verbose_name_plural': 'карточки продуктов',
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import DEFAULT_DB_ALIAS, migrations
+
+
+def build_product_cards(apps, schema_editor):
+    """
+    Карточки для продуктов, созданных до появления таблицы: без них
+    продукт отдается через ProductReadSerializer с запросами на каждый
+    продукт. Карточка повторяет ответ API, поэтому собирается текущим
+    кодом, а не историческими моделями, как команда
+    rebuild_product_cards. Реплика получает карточки репликацией.
+    """
+    if schema_editor.connection.alias != DEFAULT_DB_ALIAS:
+        return
+    from api.v1.cards import build_product_cards
+    from shop.models import Product
+
+    build_product_cards(Product.objects.all())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+        # Текущие модели совпадают со схемой только после всех миграций.
+        ('shop', '0008_catalog_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            build_product_cards, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import models
+
+from shop.models import Product
+
+
+class ProductCard(models.Model):
+    """
+    Готовое представление продукта для ответов API.
+
+    Данные хранятся строкой JSON, а не в JSONField: jsonb в PostgreSQL
+    не сохраняет порядок ключей, а ответ должен совпадать с сериализатором.
+    """
+
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="card",
+        verbose_name="Продукт",
+    )
+    payload = models.TextField("Данные")
+
+    def __str__(self):
+        return str(self.product_id)
+
+    class Meta:
+        verbose_name = "Карточка продукта"
+        verbose_name_plural = "карточки продуктов"
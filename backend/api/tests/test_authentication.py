@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+
+from api.v1.authentication import TokenCache, token_cache
+from backend.constants import AUTH_TOKEN_CACHE_SIZE, AUTH_TOKEN_CACHE_TIMEOUT
+
+
+User = get_user_model()
+
+
+class TokenCacheTest(TestCase):
+    """Сброс токена виден кешам всех процессов через общий кеш."""
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.user = User.objects.create(username="buyer")
+        self.token = Token.objects.create(user=self.user)
+        # Кеш другого процесса с тем же общим кешем Django.
+        self.worker_cache = TokenCache(
+            AUTH_TOKEN_CACHE_SIZE, AUTH_TOKEN_CACHE_TIMEOUT
+        )
+        self.worker_cache.set(
+            self.token.key, self.user, self.token,
+            self.worker_cache.get_version(self.token.key),
+        )
+
+    def get_shopping_cart(self, prefix="/api"):
+        return self.client.get(
+            f"{prefix}/products/shopping_cart/",
+            headers={"Authorization": f"Token {self.token.key}"},
+        )
+
+    def test_cached(self):
+        self.assertIsNotNone(self.worker_cache.get(self.token.key))
+
+    def test_logout(self):
+        self.assertEqual(self.get_shopping_cart().status_code, 200)
+        self.assertEqual(
+            self.get_shopping_cart("/api/async").status_code, 200
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/auth/token/logout/",
+                headers={"Authorization": f"Token {self.token.key}"},
+            )
+        self.assertEqual(response.status_code, 204)
+        self.assertIsNone(self.worker_cache.get(self.token.key))
+        self.assertEqual(self.get_shopping_cart().status_code, 401)
+        self.assertEqual(
+            self.get_shopping_cart("/api/async").status_code, 401
+        )
+
+    def test_deactivate_user(self):
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertIsNone(self.worker_cache.get(self.token.key))
+
+    def test_last_login_keeps_token(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save(update_fields=("last_login",))
+        self.assertIsNotNone(self.worker_cache.get(self.token.key))
@@ -0,0 +1,40 @@
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TransactionTestCase
+
+from api.models import ProductCard
+from shop.cache import forget_catalog_version
+from shop.models import Category, Product, Subcategory
+
+
+class BuildProductCardsMigrationTest(TransactionTestCase):
+    """Миграция собирает карточки продуктов, уже созданных в БД."""
+
+    def setUp(self):
+        cache.clear()
+        forget_catalog_version()
+        self.addCleanup(forget_catalog_version)
+        call_command("migrate", "api", "0001", verbosity=0)
+        self.addCleanup(call_command, "migrate", verbosity=0)
+
+    def test_cards_are_built(self):
+        category = Category.objects.create(
+            name="Фрукты", slug="fruits", picture=""
+        )
+        subcategory = Subcategory.objects.create(
+            category=category, name="Цитрусовые", slug="citrus", picture="",
+        )
+        # Продукты без карточек, как до появления таблицы.
+        Product.objects.bulk_create(
+            Product(
+                subcategory=subcategory, name=f"Продукт {number}",
+                slug=f"product-{number}", price=1,
+            )
+            for number in range(3)
+        )
+        ProductCard.objects.all().delete()
+        call_command("migrate", "api", "0002", verbosity=0)
+        self.assertEqual(ProductCard.objects.count(), 3)
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/products/")
+        self.assertEqual(len(response.json()["results"]), 3)
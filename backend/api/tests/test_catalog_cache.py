@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db.models import F
+from django.test import TestCase
+
+from shop.cache import forget_catalog_version
+from shop.models import CatalogVersion, Category, Product, Subcategory
+
+
+class CatalogVersionTest(TestCase):
+    """
+    Версия каталога общая для процессов: ответ из кеша меняется и после
+    изменения каталога в другом процессе, когда версия в БД выросла.
+    """
+
+    def setUp(self):
+        cache.clear()
+        forget_catalog_version()
+        self.addCleanup(forget_catalog_version)
+        category = Category.objects.create(
+            name="Фрукты", slug="fruits", picture=""
+        )
+        self.subcategory = Subcategory.objects.create(
+            category=category, name="Цитрусовые", slug="citrus", picture="",
+        )
+
+    def create_product(self, slug):
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(
+                subcategory=self.subcategory, name=slug, slug=slug, price=1,
+            )
+
+    def test_change_in_this_process(self):
+        self.create_product("orange")
+        etag = self.client.get("/api/products/")["ETag"]
+        self.create_product("lemon")
+        response = self.client.get("/api/products/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 2)
+
+    def test_change_in_other_process(self):
+        self.create_product("orange")
+        etag = self.client.get("/api/products/")["ETag"]
+        # Другой процесс меняет только БД, версия в памяти этого
+        # процесса остается прежней до истечения срока.
+        Product.objects.create(
+            subcategory=self.subcategory, name="lemon", slug="lemon", price=1,
+        )
+        CatalogVersion.objects.update(version=F("version") + 1)
+        response = self.client.get("/api/products/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        with mock.patch("shop.cache.time.monotonic", return_value=10 ** 9):
+            response = self.client.get(
+                "/api/products/", HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 2)
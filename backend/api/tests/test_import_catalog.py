@@ -0,0 +1,45 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from shop.models import Category, Product, Subcategory
+
+
+ROWS = (
+    {"type": "category", "slug": "fruits", "name": "Фрукты"},
+    "{bad json",
+    ["list"],
+    {"type": "subcategory", "slug": "citrus", "name": "Цитрусовые",
+     "parent": "fruits"},
+    {"type": "product", "slug": "orange", "name": "Апельсин",
+     "parent": "citrus", "price": 100},
+)
+
+
+class ImportCatalogTest(TestCase):
+    """Ошибка в строке JSONL не прерывает загрузку каталога."""
+
+    def setUp(self):
+        file, self.path = tempfile.mkstemp(suffix=".jsonl")
+        with os.fdopen(file, "w", encoding="utf-8") as file:
+            for row in ROWS:
+                if not isinstance(row, str):
+                    row = json.dumps(row, ensure_ascii=False)
+                file.write(row + "\n")
+        self.addCleanup(os.remove, self.path)
+
+    def test_malformed_lines_are_skipped(self):
+        stdout, stderr = StringIO(), StringIO()
+        call_command("import_catalog", self.path, stdout=stdout, stderr=stderr)
+        errors = stderr.getvalue().splitlines()
+        self.assertEqual(len(errors), 2)
+        self.assertTrue(errors[0].startswith("Строка 2: Неверный JSON"))
+        self.assertTrue(errors[1].startswith("Строка 3: "))
+        self.assertIn("Ошибок: 2.", stdout.getvalue())
+        self.assertTrue(Category.objects.filter(slug="fruits").exists())
+        self.assertTrue(Subcategory.objects.filter(slug="citrus").exists())
+        self.assertTrue(Product.objects.filter(slug="orange").exists())
@@ -0,0 +1,26 @@
+from django.test import SimpleTestCase, override_settings
+
+
+class MetricsAccessTest(SimpleTestCase):
+    """Метрики закрыты, если не задан METRICS_TOKEN и DEBUG выключен."""
+
+    def get_status(self, **headers):
+        return self.client.get("/metrics", headers=headers).status_code
+
+    @override_settings(METRICS_TOKEN="", DEBUG=False)
+    def test_denied_without_token(self):
+        self.assertEqual(self.get_status(), 403)
+
+    @override_settings(METRICS_TOKEN="", DEBUG=True)
+    def test_allowed_in_debug(self):
+        self.assertEqual(self.get_status(), 200)
+
+    @override_settings(METRICS_TOKEN="secret", DEBUG=True)
+    def test_token_required(self):
+        self.assertEqual(self.get_status(), 403)
+        self.assertEqual(
+            self.get_status(Authorization="Bearer wrong"), 403
+        )
+        self.assertEqual(
+            self.get_status(Authorization="Bearer secret"), 200
+        )
@@ -0,0 +1,59 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from api.v1.cards import build_product_cards
+from api.v1.pagination import ProductPagination
+from shop.models import Category, ImageProduct, Product, Subcategory
+
+
+PRODUCTS_COUNT = 120
+LIST_QUERIES = 2
+DETAIL_QUERIES = 1
+
+
+@override_settings(CACHES={"default": {
+    "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+}})
+class ProductQueriesTest(TestCase):
+    """Число запросов к БД не зависит от размера страницы продуктов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(
+            name="Фрукты", slug="fruits", picture="backend/categories/f.jpg"
+        )
+        subcategory = Subcategory.objects.create(
+            category=category, name="Цитрусовые", slug="citrus",
+            picture="backend/categories/c.jpg",
+        )
+        products = Product.objects.bulk_create(
+            Product(
+                subcategory=subcategory, name=f"Продукт {number}",
+                slug=f"product-{number}", price=number + 1,
+            )
+            for number in range(PRODUCTS_COUNT)
+        )
+        ImageProduct.objects.bulk_create(
+            ImageProduct(
+                product=product, image=f"backend/products/{product.slug}.jpg",
+            )
+            for product in products
+        )
+        build_product_cards(Product.objects.all())
+        cls.product = products[0]
+
+    def test_list(self):
+        for page_size in (5, 100):
+            with self.subTest(page_size=page_size), mock.patch.object(
+                ProductPagination, "page_size", page_size
+            ):
+                with self.assertNumQueries(LIST_QUERIES):
+                    response = self.client.get("/api/products/")
+                self.assertEqual(len(response.json()["results"]), page_size)
+
+    def test_detail(self):
+        with self.assertNumQueries(DETAIL_QUERIES):
+            response = self.client.get(f"/api/products/{self.product.id}/")
+        self.assertEqual(response.status_code, 200)
+
@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections, router
+from django.test import TransactionTestCase, override_settings
+
+from backend.routers import REPLICA_DB_ALIAS, read_from_replica
+from shop.cache import bump_catalog_version, forget_catalog_version
+from shop.models import CatalogVersion, Category, Product, Subcategory
+
+
+User = get_user_model()
+
+
+@override_settings(CACHES={"default": {
+    "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+}})
+class PrimaryReplicaTest(TransactionTestCase):
+    """
+    Чтение каталога из реплики во втором файле SQLite: реплика
+    используется, только если она догнала версию каталога.
+    """
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        replica = {
+            **connections.settings["default"],
+            "NAME": os.path.join(directory, "replica.sqlite3"),
+            "TEST": {"MIRROR": None},
+        }
+        connections.settings[REPLICA_DB_ALIAS] = replica
+        self.addCleanup(connections.settings.pop, REPLICA_DB_ALIAS)
+        self.addCleanup(connections.__delitem__, REPLICA_DB_ALIAS)
+        self.addCleanup(connections[REPLICA_DB_ALIAS].close)
+        databases = mock.patch.dict(
+            settings.DATABASES, {REPLICA_DB_ALIAS: replica}
+        )
+        databases.start()
+        self.addCleanup(databases.stop)
+        call_command("migrate", database=REPLICA_DB_ALIAS, verbosity=0)
+        forget_catalog_version()
+        self.addCleanup(forget_catalog_version)
+
+    def create_products(self, using, count):
+        category, = Category.objects.using(using).bulk_create((Category(
+            id=1, name="Фрукты", slug="fruits", picture=""
+        ),))
+        subcategory, = Subcategory.objects.using(using).bulk_create((
+            Subcategory(
+                id=1, category=category, name="Цитрусовые", slug="citrus",
+                picture="",
+            ),
+        ))
+        Product.objects.using(using).bulk_create(
+            Product(
+                subcategory=subcategory, name=f"Продукт {number}",
+                slug=f"product-{number}", price=1,
+            )
+            for number in range(count)
+        )
+
+    def get_count(self):
+        response = self.client.get("/api/products/")
+        self.assertEqual(response.status_code, 200)
+        return response.json()["count"]
+
+    def test_router(self):
+        self.assertEqual(router.db_for_read(Product), "default")
+        with read_from_replica():
+            self.assertEqual(router.db_for_read(Product), REPLICA_DB_ALIAS)
+            self.assertEqual(router.db_for_read(User), "default")
+            self.assertEqual(router.db_for_write(Product), "default")
+
+    def test_lagging_replica_is_not_read(self):
+        self.create_products("default", 1)
+        self.create_products(REPLICA_DB_ALIAS, 2)
+        bump_catalog_version()
+        self.assertEqual(self.get_count(), 1)
+
+    def test_replica_with_catalog_version_is_read(self):
+        self.create_products("default", 1)
+        self.create_products(REPLICA_DB_ALIAS, 2)
+        bump_catalog_version()
+        CatalogVersion.objects.using(REPLICA_DB_ALIAS).update(
+            version=CatalogVersion.objects.get().version
+        )
+        self.assertEqual(self.get_count(), 2)
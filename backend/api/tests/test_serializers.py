@@ -0,0 +1,172 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from api.models import ProductCard
+from api.v1.renderers import FastJSONRenderer
+from api.v1.serializers import ProductCardSerializer, ProductReadSerializer
+from shop.images import IMAGE_VARIANTS_DIR, get_image_variants
+from shop.models import (
+    BackgroundTask,
+    Category,
+    ImageProduct,
+    Product,
+    Subcategory,
+)
+from shop.tasks import create_image_variants
+
+
+def save_image(name, color):
+    buffer = BytesIO()
+    Image.new("RGB", (800, 600), color).save(buffer, "JPEG")
+    return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+
+class ProductCardContractTest(TestCase):
+    """
+    Ответ из карточки продукта побайтно совпадает с ответом
+    ProductReadSerializer и JSONRenderer.
+    """
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings = override_settings(MEDIA_ROOT=self.media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        cache.clear()
+        category = Category.objects.create(
+            name="Овощи", slug="vegetables",
+            picture=save_image("backend/categories/vegetables.jpg", "green"),
+        )
+        subcategory = Subcategory.objects.create(
+            category=category, name="Корнеплоды", slug="roots", picture="",
+        )
+        product = Product.objects.create(
+            subcategory=subcategory, name="Морковь\u2028мытая",
+            slug="carrot", price=100,
+        )
+        ready = ImageProduct.objects.create(
+            product=product, status=ImageProduct.Status.READY,
+            image=save_image("backend/products/ready.jpg", "orange"),
+        )
+        ImageProduct.objects.create(
+            product=product, status=ImageProduct.Status.PENDING,
+            image=save_image("backend/products/pending.jpg", "red"),
+        )
+        self.product_id = product.id
+        # Копии создают фоновые задачи, после них карточка пересобирается.
+        get_image_variants(ready.image)
+        create_image_variants(Category._meta.label, category.pk)
+
+    def get_variant_images(self):
+        return [
+            directory for directory, _, files in os.walk(
+                os.path.join(self.media_root, IMAGE_VARIANTS_DIR)
+            )
+            if files
+        ]
+
+    def get_product(self):
+        return Product.objects.select_related("card").get(id=self.product_id)
+
+    def assertSameOutput(self, context):
+        expected = JSONRenderer().render(
+            ProductReadSerializer(self.get_product(), context=context).data
+        )
+        actual = FastJSONRenderer().render(
+            ProductCardSerializer(self.get_product(), context=context).data
+        )
+        self.assertEqual(actual, expected)
+
+    def test_without_request(self):
+        self.assertSameOutput({})
+
+    def test_with_request(self):
+        request = APIRequestFactory().get("/api/products/")
+        self.assertSameOutput({"request": request})
+
+    def test_srcset_only_for_ready_images(self):
+        data = ProductCardSerializer(self.get_product()).data
+        ready, pending = data["picture"]
+        self.assertTrue(ready["srcset"])
+        self.assertEqual(pending["srcset"], {})
+        self.assertEqual(data["subcategory"]["picture"], None)
+        self.assertEqual(data["subcategory"]["picture_srcset"], {})
+        # Копии созданы только для категории и готового изображения.
+        self.assertEqual(len(self.get_variant_images()), 2)
+
+    @override_settings(BACKGROUND_TASKS_BACKEND="database")
+    def test_new_picture_is_processed_in_background(self):
+        buffer = BytesIO()
+        Image.new("RGB", (800, 600), "blue").save(buffer, "JPEG")
+        category = Category.objects.get()
+        category.picture = ContentFile(
+            buffer.getvalue(), name="backend/categories/new.jpg"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            category.save()
+        self.assertEqual(len(self.get_variant_images()), 2)
+        data = ProductCardSerializer(self.get_product()).data
+        self.assertEqual(data["category"]["picture_srcset"], {})
+        task = BackgroundTask.objects.get()
+        create_image_variants(*task.args)
+        self.assertEqual(len(self.get_variant_images()), 3)
+        data = ProductCardSerializer(self.get_product()).data
+        self.assertTrue(data["category"]["picture_srcset"])
+
+
+@override_settings(CACHES={"default": {
+    "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+}})
+class AsyncProductCardTest(TestCase):
+    """
+    Асинхронные представления сериализуют продукт без карточки так же,
+    как синхронные, и не создают карточку при чтении.
+    """
+
+    def setUp(self):
+        category = Category.objects.create(
+            name="Овощи", slug="vegetables", picture=""
+        )
+        subcategory = Subcategory.objects.create(
+            category=category, name="Корнеплоды", slug="roots", picture="",
+        )
+        self.product = Product.objects.create(
+            subcategory=subcategory, name="Морковь", slug="carrot", price=100,
+        )
+        ProductCard.objects.all().delete()
+
+    def test_same_output_without_card(self):
+        for path in ("products/", f"products/{self.product.id}/"):
+            with self.subTest(path=path):
+                expected = self.client.get(f"/api/{path}")
+                actual = self.client.get(f"/api/async/{path}")
+                self.assertEqual(actual.status_code, 200)
+                self.assertEqual(actual.json(), expected.json())
+        self.assertFalse(ProductCard.objects.exists())
+
+
+class FastJSONRendererTest(TestCase):
+    """FastJSONRenderer выводит те же байты, что и JSONRenderer."""
+
+    def test_same_output(self):
+        data = {
+            "name": "строка\u2028с\u2029разделителями",
+            "created_at": timezone.now(),
+            "date": timezone.now().date(),
+            "items": [1, 2.5, None, True],
+        }
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data)
+        )
@@ -0,0 +1,174 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from .utils import run_in_threads
+from api.v1.shopping_cart import checkout_shopping_cart
+from backend.constants import MAX_VALUE_VALIDATOR_AMOUNT
+from backend.performance import query_budget
+from shop.models import (
+    Category,
+    OrderItem,
+    Product,
+    ShoppingCart,
+    Subcategory
+)
+
+
+User = get_user_model()
+
+THREADS = 8
+REQUESTS_PER_THREAD = 5
+BUYERS = 12
+AMOUNT = 3
+STOCK = 20
+LARGE_CART = 200
+# BEGIN IMMEDIATE, корзина, остатки, заказ, продукты заказа
+# и очистка корзины.
+CHECKOUT_QUERIES = 6
+
+
+def create_product(slug, **kwargs):
+    category = Category.objects.create(
+        name=slug, slug=f"{slug}-category", picture="backend/categories/c.jpg"
+    )
+    subcategory = Subcategory.objects.create(
+        category=category, name=slug, slug=f"{slug}-subcategory",
+        picture="backend/categories/s.jpg",
+    )
+    return Product.objects.create(
+        subcategory=subcategory, name=slug, slug=slug, **kwargs
+    )
+
+
+def get_client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+    return client
+
+
+@override_settings(REST_FRAMEWORK={
+    **settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {}
+})
+class ShoppingCartAmountTest(TestCase):
+    """Количество в корзине не превышает MAX_VALUE_VALIDATOR_AMOUNT."""
+
+    def setUp(self):
+        self.user = User.objects.create(username="buyer")
+        self.product = create_product("apple", price=10)
+        self.line = ShoppingCart.objects.create(
+            user=self.user, product=self.product,
+            amount=MAX_VALUE_VALIDATOR_AMOUNT,
+        )
+        self.client = get_client(Token.objects.create(user=self.user).key)
+
+    def patch(self, amount):
+        return self.client.patch(
+            f"/api/products/{self.product.id}/add_shopping_cart/",
+            {"amount": amount}, format="json",
+        )
+
+    def bulk(self, amount):
+        return self.client.post(
+            "/api/products/shopping_cart/bulk/",
+            [{"product": self.product.id, "amount": amount}], format="json",
+        )
+
+    def test_amount_above_limit(self):
+        for send in (self.patch, self.bulk):
+            with self.subTest(send=send.__name__):
+                response = send(str(MAX_VALUE_VALIDATOR_AMOUNT + 1))
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("amount", str(response.json()))
+
+    def test_increment_stops_at_limit(self):
+        for send in (self.patch, self.bulk):
+            with self.subTest(send=send.__name__):
+                self.assertLess(send("+").status_code, 300)
+                self.line.refresh_from_db()
+                self.assertEqual(self.line.amount, MAX_VALUE_VALIDATOR_AMOUNT)
+
+
+@override_settings(REST_FRAMEWORK={
+    **settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {}
+})
+class ShoppingCartConcurrencyTest(TransactionTestCase):
+    """Параллельные изменения количества не теряют обновлений."""
+
+    def test_parallel_increments(self):
+        user = User.objects.create(username="buyer")
+        product = create_product("apple", price=10)
+        ShoppingCart.objects.create(user=user, product=product, amount=1)
+        token = Token.objects.create(user=user).key
+        url = f"/api/products/{product.id}/add_shopping_cart/"
+        statuses = []
+
+        def increment():
+            client = get_client(token)
+            for _ in range(REQUESTS_PER_THREAD):
+                statuses.append(client.patch(
+                    url, {"amount": "+"}, format="json"
+                ).status_code)
+
+        run_in_threads(increment, THREADS)
+        self.assertEqual(statuses, [201] * THREADS * REQUESTS_PER_THREAD)
+        self.assertEqual(
+            ShoppingCart.objects.get(user=user, product=product).amount,
+            1 + THREADS * REQUESTS_PER_THREAD,
+        )
+
+
+@override_settings(REST_FRAMEWORK={
+    **settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {}
+})
+class CheckoutTest(TransactionTestCase):
+    """Оформление заказа: остатки и число запросов к БД."""
+
+    def test_parallel_checkouts_do_not_oversell(self):
+        product = create_product("pear", price=10, stock=STOCK)
+        tokens = []
+        for number in range(BUYERS):
+            user = User.objects.create(username=f"buyer{number}")
+            ShoppingCart.objects.create(
+                user=user, product=product, amount=AMOUNT
+            )
+            tokens.append(Token.objects.create(user=user).key)
+        statuses = []
+
+        def checkout():
+            statuses.append(get_client(tokens.pop()).post(
+                "/api/products/checkout/"
+            ).status_code)
+
+        run_in_threads(checkout, BUYERS)
+        product.refresh_from_db()
+        sold = OrderItem.objects.aggregate(sold=Sum("amount"))["sold"]
+        self.assertEqual(sold + product.stock, STOCK)
+        self.assertEqual(statuses.count(201), STOCK // AMOUNT)
+        self.assertEqual(statuses.count(400), BUYERS - STOCK // AMOUNT)
+        self.assertEqual(
+            ShoppingCart.objects.count(), BUYERS - STOCK // AMOUNT
+        )
+
+    def test_checkout_queries(self):
+        user = User.objects.create(username="buyer")
+        subcategory = create_product("first", price=10).subcategory
+        products = Product.objects.bulk_create(
+            Product(
+                subcategory=subcategory, name=f"product-{number}",
+                slug=f"product-{number}", price=10, stock=2,
+            )
+            for number in range(LARGE_CART)
+        )
+        for lines in (1, LARGE_CART):
+            with self.subTest(lines=lines):
+                ShoppingCart.objects.bulk_create(
+                    ShoppingCart(user=user, product=product, amount=1)
+                    for product in products[-lines:]
+                )
+                with query_budget(CHECKOUT_QUERIES):
+                    order = checkout_shopping_cart(user)
+                self.assertEqual(len(order.item_list), lines)
@@ -0,0 +1,29 @@
+from concurrent.futures import Future
+
+from django.db.models import F
+from django.test import TestCase
+
+from shop.cache import forget_catalog_version, get_catalog_version
+from shop.models import CatalogVersion
+from shop.tasks import finish_task
+
+
+class ProcessTaskTest(TestCase):
+    """
+    Версия каталога, измененная задачей в пуле процессов, сразу видна
+    процессу, который поставил задачу.
+    """
+
+    def setUp(self):
+        forget_catalog_version()
+        self.addCleanup(forget_catalog_version)
+
+    def test_catalog_version_is_reread(self):
+        version = get_catalog_version()
+        # Так версию меняет сохранение изображения в процессе пула.
+        CatalogVersion.objects.update(version=F("version") + 1)
+        self.assertEqual(get_catalog_version(), version)
+        future = Future()
+        future.set_result(None)
+        finish_task(future)
+        self.assertEqual(get_catalog_version(), version + 1)
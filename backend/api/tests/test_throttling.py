@@ -0,0 +1,85 @@
+import os
+import tempfile
+from unittest import skipUnless
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from .utils import run_in_threads
+from api.v1.throttling import parse_rate, take_token
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+CAPACITY, RATE = parse_rate("5/min")
+PARALLEL_REQUESTS = 20
+
+
+def get_redis_cache_settings():
+    """Redis из TEST_REDIS_URL, иначе fakeredis, если он установлен."""
+    backend = "django.core.cache.backends.redis.RedisCache"
+    if os.getenv("TEST_REDIS_URL"):
+        return {"BACKEND": backend, "LOCATION": os.getenv("TEST_REDIS_URL")}
+    if fakeredis is not None:
+        return {
+            "BACKEND": backend,
+            "LOCATION": "redis://localhost:6379/15",
+            "OPTIONS": {"connection_class": fakeredis.FakeConnection},
+        }
+    return None
+
+
+class TokenBucketMixin:
+    """Общие проверки корзины токенов для разных бэкендов кеша."""
+
+    def setUp(self):
+        caches["default"].clear()
+
+    def test_capacity(self):
+        waits = [take_token("bucket", CAPACITY, RATE) for _ in range(CAPACITY)]
+        self.assertEqual(waits, [0] * CAPACITY)
+        wait = take_token("bucket", CAPACITY, RATE)
+        self.assertGreater(wait, 0)
+        self.assertLessEqual(wait, 1 / RATE)
+
+    def test_parallel_requests(self):
+        waits = []
+
+        def take():
+            waits.append(take_token("parallel", CAPACITY, RATE))
+
+        run_in_threads(take, PARALLEL_REQUESTS)
+        self.assertEqual(waits.count(0), CAPACITY)
+
+
+@override_settings(CACHES={"default": {
+    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+}})
+class LocMemTokenBucketTest(TokenBucketMixin, SimpleTestCase):
+    pass
+
+
+@skipUnless(
+    get_redis_cache_settings(), "нужен TEST_REDIS_URL или fakeredis[lua]"
+)
+@override_settings(CACHES={"default": get_redis_cache_settings() or {}})
+class RedisTokenBucketTest(TokenBucketMixin, SimpleTestCase):
+    """Lua-скрипт TOKEN_BUCKET_SCRIPT в Redis."""
+
+
+class SharedCacheTest(SimpleTestCase):
+
+    def test_file_cache_not_supported(self):
+        with tempfile.TemporaryDirectory() as location, override_settings(
+            CACHES={"default": {
+                "BACKEND": "django.core.cache.backends.filebased."
+                           "FileBasedCache",
+                "LOCATION": location,
+            }}
+        ):
+            with self.assertRaises(ImproperlyConfigured):
+                take_token("bucket", CAPACITY, RATE)
@@ -0,0 +1,337 @@
+import functools
+import json
+import math
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse, QueryDict
+from django.utils.translation import gettext_lazy as _
+from django_filters.utils import translate_validation
+from rest_framework import exceptions, status
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .authentication import get_cached_credentials, token_cache
+from .cache import (
+    get_cached_shopping_cart,
+    get_shopping_cart_cache_key,
+    invalidate_shopping_cart,
+    set_cached_shopping_cart,
+)
+from .filters import ProductFilterSet, ProductOrderingFilter
+from .mixins import (
+    can_read_from_replica,
+    get_catalog_cache_keys,
+    is_not_modified,
+)
+from .renderers import FastJSONRenderer
+from .serializers import (
+    ProductCardSerializer,
+    ShoppingCartAllProductsSerializer,
+    ShoppingCartSerializer,
+    ShoppingCartUpdateSerializer,
+)
+from .shopping_cart import (
+    add_shopping_cart_product,
+    change_shopping_cart_amount,
+    get_shopping_cart_totals,
+)
+from .throttling import get_throttle_wait
+from .views import ProductViewSet
+from backend.constants import CATALOG_CACHE_TIMEOUT
+from backend.routers import read_from_replica
+from shop.models import Product, ShoppingCart
+
+
+renderer = FastJSONRenderer()
+
+
+def render(data, status_code=status.HTTP_200_OK, headers=None):
+    return HttpResponse(
+        renderer.render(data),
+        content_type=renderer.media_type,
+        status=status_code,
+        headers=headers,
+    )
+
+
+async def authenticate(request):
+    """Асинхронный аналог CachingTokenAuthentication."""
+    auth = request.headers.get("Authorization", "").split()
+    if not auth or auth[0].lower() != "token":
+        return AnonymousUser()
+    if len(auth) != 2:
+        raise exceptions.AuthenticationFailed(
+            _("Invalid token header. No credentials provided.")
+        )
+    credentials = await sync_to_async(get_cached_credentials)(auth[1])
+    if credentials is not None:
+        return credentials[0]
+    version = await sync_to_async(token_cache.get_version)(auth[1])
+    try:
+        token = await Token.objects.select_related("user").aget(key=auth[1])
+    except Token.DoesNotExist:
+        raise exceptions.AuthenticationFailed(_("Invalid token."))
+    if not token.user.is_active:
+        raise exceptions.AuthenticationFailed(
+            _("User inactive or deleted.")
+        )
+    token_cache.set(auth[1], token.user, token, version)
+    return token.user
+
+
+def api_view(*methods, authenticated=False, throttle_scopes=None):
+    """
+    Асинхронное представление с проверкой метода, токена и лимита
+    запросов. throttle_scopes сопоставляет методу имя лимита из
+    DEFAULT_THROTTLE_RATES, общее с действием синхронного ViewSet.
+    Ошибки DRF отдаются в том же формате, что и в синхронном API.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                if request.method not in methods:
+                    raise exceptions.MethodNotAllowed(request.method)
+                request.user = await authenticate(request)
+                if authenticated and not request.user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+                if throttle_scopes and request.method in throttle_scopes:
+                    wait = await sync_to_async(get_throttle_wait)(
+                        request, throttle_scopes[request.method]
+                    )
+                    if wait:
+                        raise exceptions.Throttled(math.ceil(wait))
+                return await view(request, *args, **kwargs)
+            except exceptions.APIException as exc:
+                headers = {}
+                if isinstance(exc, exceptions.MethodNotAllowed):
+                    headers["Allow"] = ", ".join(methods)
+                if isinstance(exc, (
+                    exceptions.AuthenticationFailed,
+                    exceptions.NotAuthenticated,
+                )):
+                    headers["WWW-Authenticate"] = "Token"
+                if getattr(exc, "wait", None):
+                    headers["Retry-After"] = "%d" % exc.wait
+                data = exc.detail
+                if not isinstance(data, (dict, list)):
+                    data = {"detail": data}
+                return render(data, exc.status_code, headers)
+
+        # csrf_exempt в Django 4.2 не поддерживает корутины.
+        wrapper.csrf_exempt = True
+        return wrapper
+
+    return decorator
+
+
+def get_request_data(request):
+    if request.content_type == "application/json":
+        try:
+            return json.loads(request.body or b"{}")
+        except ValueError as exc:
+            raise exceptions.ParseError(f"JSON parse error - {exc}")
+    return QueryDict(request.body)
+
+
+async def serialize(serializer, products):
+    """
+    Данные сериализатора с карточками продуктов. Продукт без карточки,
+    как и в синхронном API, сериализуется ProductReadSerializer
+    с запросами к БД, поэтому тогда сериализатор выполняется в потоке.
+    Карточки при чтении не создаются: GET может идти в реплику.
+    """
+    if all(hasattr(product, "card") for product in products):
+        return serializer.data
+    return await sync_to_async(lambda: serializer.data)()
+
+
+async def get_product_or_404(pk):
+    if not await Product.objects.filter(pk=pk).aexists():
+        raise exceptions.NotFound("No Product matches the given query.")
+
+
+async def get_cached_catalog(request, view, *args):
+    """Кеширование ответа каталога, как в CatalogCacheMixin."""
+    version, etag, key = await sync_to_async(get_catalog_cache_keys)(
+        request, renderer.format
+    )
+    headers = {"ETag": etag}
+    if is_not_modified(request, etag):
+        return HttpResponse(
+            status=status.HTTP_304_NOT_MODIFIED, headers=headers
+        )
+    data = await cache.aget(key)
+    if data is None:
+        with read_from_replica(
+            await sync_to_async(can_read_from_replica)(version)
+        ):
+            data = await view(request, *args)
+        await cache.aset(key, data, CATALOG_CACHE_TIMEOUT)
+    return render(data, headers=headers)
+
+
+@api_view("GET")
+async def product_list(request):
+    """Список продуктов с фильтрами, сортировкой и номером страницы."""
+    with read_from_replica():
+        return await get_cached_catalog(request, get_product_list)
+
+
+async def get_product_list(request):
+    filterset = ProductFilterSet(
+        request.GET, queryset=Product.objects.select_related("card")
+    )
+    if not filterset.is_valid():
+        raise translate_validation(filterset.errors)
+    queryset = ProductOrderingFilter().filter_queryset(
+        Request(request), filterset.qs, ProductViewSet
+    )
+    page_size = api_settings.PAGE_SIZE
+    count = await queryset.acount()
+    pages = max((count + page_size - 1) // page_size, 1)
+    page = request.GET.get("page", 1)
+    if page == "last":
+        page = pages
+    try:
+        page = int(page)
+    except (TypeError, ValueError):
+        page = 0
+    if not 1 <= page <= pages:
+        raise exceptions.NotFound(_("Invalid page."))
+    products = [
+        product async for product in
+        queryset[(page - 1) * page_size:page * page_size]
+    ]
+    url = request.build_absolute_uri()
+    if page == 2:
+        previous = remove_query_param(url, "page")
+    elif page > 2:
+        previous = replace_query_param(url, "page", page - 1)
+    else:
+        previous = None
+    return {
+        "count": count,
+        "next": (
+            replace_query_param(url, "page", page + 1)
+            if page < pages else None
+        ),
+        "previous": previous,
+        "results": await serialize(
+            ProductCardSerializer(
+                products, many=True, context={"request": request}
+            ),
+            products,
+        ),
+    }
+
+
+@api_view("GET")
+async def product_detail(request, pk):
+    with read_from_replica():
+        return await get_cached_catalog(request, get_product_detail, pk)
+
+
+async def get_product_detail(request, pk):
+    try:
+        product = await Product.objects.select_related("card").aget(pk=pk)
+    except Product.DoesNotExist:
+        raise exceptions.NotFound("No Product matches the given query.")
+    return await serialize(
+        ProductCardSerializer(product, context={"request": request}),
+        (product,),
+    )
+
+
+@api_view("GET", authenticated=True)
+async def shopping_cart(request):
+    """Содержимое корзины целиком, количество и общая цена."""
+    key = await sync_to_async(get_shopping_cart_cache_key)(request)
+    data = await sync_to_async(get_cached_shopping_cart)(key)
+    if data is None:
+        queryset = ShoppingCart.objects.filter(user=request.user)
+        totals = await queryset.aaggregate(**get_shopping_cart_totals())
+        items = [
+            item async for item in
+            queryset.select_related("product__card").order_by("id")
+        ]
+        data = await serialize(
+            ShoppingCartAllProductsSerializer(items, context=totals),
+            [item.product for item in items],
+        )
+        await sync_to_async(set_cached_shopping_cart)(key, data)
+    return render(data)
+
+
+@api_view(
+    "POST", "PATCH", "DELETE", authenticated=True, throttle_scopes={
+        "POST": "add_shopping_cart",
+        "PATCH": "add_shopping_cart",
+        "DELETE": "delete_shopping_cart",
+    },
+)
+async def add_shopping_cart(request, pk):
+    """
+    Добавление, изменение количества и удаление продукта из корзины.
+    Записи выполняются в потоке: транзакции в асинхронном ORM
+    не поддерживаются.
+    """
+    user = request.user
+    if request.method == "DELETE":
+        await get_product_or_404(pk)
+        count_del_objects, _ = await ShoppingCart.objects.filter(
+            user=user, product=pk
+        ).adelete()
+        await sync_to_async(invalidate_shopping_cart)(user)
+        if not count_del_objects:
+            return render(
+                "Вы не добавляли в корзину этот продукт.",
+                status.HTTP_400_BAD_REQUEST,
+            )
+        return render(
+            "Продукт успешно удален из корзины", status.HTTP_204_NO_CONTENT
+        )
+    if request.method == "PATCH":
+        serializer = ShoppingCartUpdateSerializer(
+            data=get_request_data(request)
+        )
+        serializer.is_valid(raise_exception=True)
+        if await sync_to_async(change_shopping_cart_amount)(
+            user, pk, serializer.validated_data.get("amount")
+        ):
+            return render(
+                "Продукт успешно удален из корзины",
+                status.HTTP_204_NO_CONTENT,
+            )
+        try:
+            item = await ShoppingCart.objects.select_related(
+                "product__card"
+            ).aget(user=user, product=pk)
+        except ShoppingCart.DoesNotExist:
+            raise exceptions.NotFound(
+                "No ShoppingCart matches the given query."
+            )
+        data = await serialize(ShoppingCartSerializer(item), (item.product,))
+    else:
+        await get_product_or_404(pk)
+        data = await sync_to_async(add_shopping_cart_product)(user, pk)
+    return render(data, status.HTTP_201_CREATED)
+
+
+@api_view(
+    "DELETE", authenticated=True,
+    throttle_scopes={"DELETE": "clean_all_shopping_cart"},
+)
+async def clean_all_shopping_cart(request):
+    count_del_objects, _ = await ShoppingCart.objects.filter(
+        user=request.user
+    ).adelete()
+    await sync_to_async(invalidate_shopping_cart)(request.user)
+    if not count_del_objects:
+        return render("Корзина пуста.", status.HTTP_400_BAD_REQUEST)
+    return render("Корзина успешно очищена.", status.HTTP_204_NO_CONTENT)
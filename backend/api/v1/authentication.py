@@ -0,0 +1,113 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+
+from .cache import CacheStats
+from backend.constants import AUTH_TOKEN_CACHE_SIZE, AUTH_TOKEN_CACHE_TIMEOUT
+from backend.metrics import register_cache_stats
+
+
+TOKEN_VERSION_KEY = "auth:token:version:{key}"
+
+
+class TokenCache:
+    """
+    Ограниченный по размеру и времени жизни LRU-кеш токен -> пользователь
+    в памяти процесса.
+
+    Запись хранит версию токена из общего кеша Django, прочитанную до
+    запроса к БД, и действует, пока версия не изменилась. revoke()
+    удаляет версию, поэтому выход и изменение пользователя сбрасывают
+    записи во всех процессах.
+    """
+
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, user, token, version = entry
+            if expires < time.monotonic():
+                self.entries.pop(key, None)
+                return None
+            self.entries.move_to_end(key)
+        if cache.get(TOKEN_VERSION_KEY.format(key=key)) != version:
+            self.delete(key)
+            return None
+        return copy.copy(user), token
+
+    def get_version(self, key):
+        """Версия токена, ее нужно получить до чтения токена из БД."""
+        version_key = TOKEN_VERSION_KEY.format(key=key)
+        version = cache.get(version_key)
+        if version is None:
+            cache.add(version_key, time.time_ns(), self.timeout)
+            version = cache.get(version_key)
+        return version
+
+    def set(self, key, user, token, version):
+        with self._lock:
+            self.entries.pop(key, None)
+            self.entries[key] = (
+                time.monotonic() + self.timeout, copy.copy(user), token,
+                version,
+            )
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self.entries.pop(key, None)
+
+    def revoke(self, keys):
+        """Сброс токенов во всех процессах."""
+        cache.delete_many(
+            [TOKEN_VERSION_KEY.format(key=key) for key in keys]
+        )
+        with self._lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+
+token_cache = TokenCache(AUTH_TOKEN_CACHE_SIZE, AUTH_TOKEN_CACHE_TIMEOUT)
+# Каждое попадание экономит запрос Token + User к БД.
+token_cache_stats = CacheStats()
+register_cache_stats("auth_token", token_cache_stats)
+
+
+def get_cached_credentials(key):
+    credentials = token_cache.get(key)
+    if credentials is None:
+        token_cache_stats.miss()
+    else:
+        token_cache_stats.hit()
+    return credentials
+
+
+class CachingTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication с кешем найденных токенов. Неверные токены
+    и неактивные пользователи не кешируются.
+    """
+
+    def authenticate_credentials(self, key):
+        credentials = get_cached_credentials(key)
+        if credentials is None:
+            version = token_cache.get_version(key)
+            credentials = super().authenticate_credentials(key)
+            token_cache.set(key, *credentials, version)
+        return credentials
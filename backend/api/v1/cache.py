@@ -0,0 +1,79 @@
+import hashlib
+import threading
+import time
+
+from django.core.cache import cache
+
+from backend.constants import SHOPPING_CART_CACHE_TIMEOUT
+from backend.metrics import register_cache_stats
+from shop.cache import get_catalog_version
+
+
+SHOPPING_CART_VERSION_KEY = "shopping_cart:version:{user}"
+SHOPPING_CART_KEY = "shopping_cart:{user}:{version}:{catalog}:{url}"
+
+
+class CacheStats:
+    """Счетчики попаданий и промахов кеша в рамках процесса."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def as_dict(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+shopping_cart_cache_stats = CacheStats()
+register_cache_stats("shopping_cart", shopping_cart_cache_stats)
+
+
+def get_shopping_cart_cache_key(request):
+    """
+    Ключ корзины: пользователь, версия его корзины, версия каталога
+    и адрес запроса (от него зависят страница и ссылки пагинации).
+    """
+    user = request.user.id
+    version_key = SHOPPING_CART_VERSION_KEY.format(user=user)
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, time.time_ns(), timeout=None)
+        version = cache.get(version_key)
+    catalog = get_catalog_version()
+    url = hashlib.md5(
+        request.build_absolute_uri().encode(), usedforsecurity=False
+    ).hexdigest()
+    return SHOPPING_CART_KEY.format(
+        user=user, version=version, catalog=catalog, url=url
+    )
+
+
+def get_cached_shopping_cart(key):
+    data = cache.get(key)
+    if data is None:
+        shopping_cart_cache_stats.miss()
+    else:
+        shopping_cart_cache_stats.hit()
+    return data
+
+
+def set_cached_shopping_cart(key, data):
+    cache.set(key, data, SHOPPING_CART_CACHE_TIMEOUT)
+
+
+def invalidate_shopping_cart(user):
+    """Смена версии корзины пользователя после ее изменения."""
+    version_key = SHOPPING_CART_VERSION_KEY.format(user=user.id)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.add(version_key, time.time_ns(), timeout=None)
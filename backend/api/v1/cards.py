@@ -0,0 +1,37 @@
+import json
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from .serializers import ProductValuesSerializer
+from api.models import ProductCard
+from backend.constants import PRODUCT_CARD_CHUNK_SIZE
+
+
+def build_product_cards(products):
+    """
+    Пересборка карточек продуктов из queryset пачками. Карточки
+    собираются без запроса, поэтому все ссылки в них относительные.
+    """
+    cards = []
+    count = 0
+    for product, data in ProductValuesSerializer(
+        products.order_by("id")
+    ).iterate(PRODUCT_CARD_CHUNK_SIZE):
+        cards.append(ProductCard(
+            product_id=product,
+            payload=json.dumps(data, cls=JSONEncoder, ensure_ascii=False),
+        ))
+        if len(cards) >= PRODUCT_CARD_CHUNK_SIZE:
+            count += save_product_cards(cards)
+            cards = []
+    return count + save_product_cards(cards)
+
+
+def save_product_cards(cards):
+    ProductCard.objects.bulk_create(
+        cards,
+        update_conflicts=True,
+        unique_fields=("product",),
+        update_fields=("payload",),
+    )
+    return len(cards)
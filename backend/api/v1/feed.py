@@ -0,0 +1,41 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from backend.constants import PRODUCT_FEED_CHUNK_SIZE
+
+
+def get_feed_row(product, request):
+    """Плоское представление продукта для выгрузки."""
+    subcategory = product.subcategory
+    category = subcategory.category
+    return {
+        "id": product.id,
+        "name": product.name,
+        "slug": product.slug,
+        "price": product.price,
+        "updated_at": product.updated_at,
+        "subcategory_id": subcategory.id,
+        "subcategory_slug": subcategory.slug,
+        "subcategory_name": subcategory.name,
+        "category_id": category.id,
+        "category_slug": category.slug,
+        "category_name": category.name,
+        "pictures": [
+            request.build_absolute_uri(image.image.url)
+            for image in product.imageproduct_set.all()
+        ],
+    }
+
+
+def stream_feed(queryset, request):
+    """
+    Построчная выдача продуктов в NDJSON. Продукты читаются пачками,
+    изображения подгружаются одним запросом на пачку.
+    """
+    for product in queryset.iterator(chunk_size=PRODUCT_FEED_CHUNK_SIZE):
+        yield json.dumps(
+            get_feed_row(product, request),
+            cls=DjangoJSONEncoder,
+            ensure_ascii=False,
+        ) + "\n"
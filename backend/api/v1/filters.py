@@ -0,0 +1,38 @@
+import django_filters
+from rest_framework import filters
+
+from shop.models import Product
+
+
+class ProductFilterSet(django_filters.FilterSet):
+    """Фильтрация продуктов по подкатегории, категории и цене."""
+
+    subcategory = django_filters.CharFilter(field_name="subcategory__slug")
+    category = django_filters.CharFilter(
+        field_name="subcategory__category__slug"
+    )
+    price_min = django_filters.NumberFilter(
+        field_name="price", lookup_expr="gte"
+    )
+    price_max = django_filters.NumberFilter(
+        field_name="price", lookup_expr="lte"
+    )
+
+    class Meta:
+        model = Product
+        fields = ("subcategory", "category", "price_min", "price_max")
+
+
+class ProductOrderingFilter(filters.OrderingFilter):
+    """
+    Сортировка продуктов по цене или названию.
+
+    К выбранной сортировке добавляется id, чтобы порядок был
+    однозначным для постраничного и курсорного вывода.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and not {"id", "-id"} & set(ordering):
+            ordering = (*ordering, "id")
+        return ordering
@@ -0,0 +1,94 @@
+import hashlib
+
+from django.core.cache import cache
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from backend.constants import CATALOG_CACHE_TIMEOUT
+from backend.routers import read_from_replica, replica_enabled
+from shop.cache import get_catalog_version, replica_has_catalog_version
+
+
+CATALOG_RESPONSE_KEY = "catalog:{version}:{request}"
+
+
+def get_catalog_cache_keys(request, renderer_format):
+    """Версия каталога, ETag и ключ кеша ответа каталога на запрос."""
+    version = get_catalog_version()
+    digest = hashlib.md5(
+        f"{request.build_absolute_uri()} {renderer_format}".encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    return (
+        version,
+        f'"{version}-{digest}"',
+        CATALOG_RESPONSE_KEY.format(version=version, request=digest),
+    )
+
+
+def can_read_from_replica(version):
+    """
+    Ответ версии version можно строить по реплике, только если она
+    догнала эту версию. Иначе отставшие данные попали бы в кеш под
+    новой версией и с новым ETag, поэтому чтение идет из основной БД.
+    """
+    return replica_enabled() and replica_has_catalog_version(version)
+
+
+def is_not_modified(request, etag):
+    if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+    return etag in if_none_match or "*" in if_none_match
+
+
+class CatalogCacheMixin:
+    """
+    Кеширование списков и отдельных объектов каталога.
+
+    Ответ хранится по версии каталога и адресу запроса, ETag строится
+    из тех же данных, поэтому запрос с If-None-Match сверяется с ним
+    без обращения к БД и к сохраненному ответу.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_cached_response(self, view, request, *args, **kwargs):
+        version, etag, key = get_catalog_cache_keys(
+            request, request.accepted_renderer.format
+        )
+        if is_not_modified(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            data = cache.get(key)
+            if data is None:
+                with read_from_replica(can_read_from_replica(version)):
+                    response = view(request, *args, **kwargs)
+                cache.set(key, response.data, CATALOG_CACHE_TIMEOUT)
+            else:
+                response = Response(data)
+        response["ETag"] = etag
+        return response
+
+
+class ReplicaReadMixin:
+    """
+    Чтение из реплики для действий из replica_actions. Остальные
+    действия, в том числе корзина, работают с основной БД. Ответы
+    CatalogCacheMixin читают реплику, только если она не отстает
+    от версии каталога.
+    """
+
+    replica_actions = ("list", "retrieve")
+
+    def dispatch(self, request, *args, **kwargs):
+        action = self.action_map.get(request.method.lower())
+        with read_from_replica(action in self.replica_actions):
+            return super().dispatch(request, *args, **kwargs)
@@ -0,0 +1,90 @@
+from rest_framework.pagination import (
+    CursorPagination,
+    LimitOffsetPagination,
+    PageNumberPagination,
+)
+from rest_framework.response import Response
+
+from backend.constants import (
+    CURSOR_PAGINATION_MAX_PAGE_SIZE,
+    SHOPPING_CART_MAX_PAGE_SIZE
+)
+
+
+class CatalogCursorPagination(CursorPagination):
+    """Курсорная пагинация каталога по id, без запроса COUNT(*)."""
+
+    ordering = "id"
+    page_size_query_param = "page_size"
+    max_page_size = CURSOR_PAGINATION_MAX_PAGE_SIZE
+
+
+class CursorSwitchMixin:
+    """
+    Переключение на курсорную пагинацию параметром pagination=cursor.
+
+    Без параметра используется основной класс пагинации, поэтому
+    прежние клиенты получают ответы в привычном формате.
+    """
+
+    cursor_pagination_class = CatalogCursorPagination
+    pagination_query_param = "pagination"
+    cursor_pagination_value = "cursor"
+
+    cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (
+            request.query_params.get(self.pagination_query_param)
+            == self.cursor_pagination_value
+        ):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
+
+
+class CategoryPagination(CursorSwitchMixin, LimitOffsetPagination):
+    """Пагинация категорий: limit/offset или курсор."""
+
+
+class ProductPagination(CursorSwitchMixin, PageNumberPagination):
+    """Пагинация продуктов: номер страницы или курсор."""
+
+
+class ShoppingCartPagination(PageNumberPagination):
+    """
+    Постраничный вывод продуктов корзины.
+
+    Включается только при наличии в запросе параметров page или
+    page_size, без них корзина возвращается целиком.
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = SHOPPING_CART_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not (
+            {self.page_query_param, self.page_size_query_param}
+            & set(request.query_params)
+        ):
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            **data,
+        })
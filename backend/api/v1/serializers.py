@@ -1,9 +1,24 @@
+import json
+
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import IntegrityError
 from rest_framework import serializers
 
+from backend.constants import (
+    CATEGORY_DEPTH_COUNT,
+    CATEGORY_DEPTH_PRODUCTS,
+    CHANGE_VALUE_SHOPPING_CART,
+    MAX_VALUE_VALIDATOR_AMOUNT,
+    VALUE_FOR_REMOVING_PRODUCT
+)
+from backend.db import atomic_immediate
+from shop.images import find_image_variants, get_image_variants
 from shop.models import (
     Category,
     ImageProduct,
+    Order,
+    OrderItem,
     Product,
     ShoppingCart,
     Subcategory
@@ -13,43 +28,112 @@ from shop.models import (
 User = get_user_model()
 
 
+class ImageVariantsField(serializers.ReadOnlyField):
+    """
+    Уменьшенные копии изображения в формате
+    {формат: {ширина: ссылка}} для атрибута srcset.
+    """
+
+    def get_attribute(self, instance):
+        return super().get_attribute(instance) or {}
+
+    def to_representation(self, value):
+        request = self.context.get("request")
+        variants = {}
+        for image_format, widths in get_image_variants(value).items():
+            variants[image_format] = {}
+            for width, name in widths.items():
+                url = value.storage.url(name)
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                variants[image_format][width] = url
+        return variants
+
+
 class SubcategorySerializer(serializers.ModelSerializer):
     """Отображение подкатегорий."""
 
+    picture_srcset = ImageVariantsField(source="picture")
+
     class Meta:
         model = Subcategory
-        fields = ("id", "category", "name", "picture")
+        fields = ("id", "category", "name", "picture", "picture_srcset")
+
+
+class SubcategoryProductSerializer(serializers.ModelSerializer):
+    """Краткое отображение продуктов внутри подкатегории."""
+
+    class Meta:
+        model = Product
+        fields = ("id", "name", "slug", "price")
+
+
+class SubcategoryWithCountSerializer(SubcategorySerializer):
+    """Отображение подкатегорий с количеством продуктов."""
+
+    products_count = serializers.IntegerField(read_only=True)
+
+    class Meta(SubcategorySerializer.Meta):
+        fields = SubcategorySerializer.Meta.fields + ("products_count",)
+
+
+class SubcategoryWithProductsSerializer(SubcategoryWithCountSerializer):
+    """Отображение подкатегорий с количеством и первыми продуктами."""
+
+    products = SubcategoryProductSerializer(
+        source="top_products", many=True, read_only=True
+    )
+
+    class Meta(SubcategoryWithCountSerializer.Meta):
+        fields = SubcategoryWithCountSerializer.Meta.fields + ("products",)
 
 
 class CategoryWithSubcategorySerializer(serializers.ModelSerializer):
     """Отображение категорий с их подкатегориями."""
 
+    subcategory_serializers = {
+        CATEGORY_DEPTH_COUNT: SubcategoryWithCountSerializer,
+        CATEGORY_DEPTH_PRODUCTS: SubcategoryWithProductsSerializer,
+    }
+
     subcategory = serializers.SerializerMethodField(read_only=True)
+    picture_srcset = ImageVariantsField(source="picture")
 
     class Meta:
         model = Category
-        fields = ("id", "name", "picture", "subcategory")
+        fields = ("id", "name", "picture", "picture_srcset", "subcategory")
 
     def get_subcategory(self, obj):
-        return SubcategorySerializer(
-            Subcategory.objects.filter(category=obj), many=True, read_only=True
+        """
+        Подкатегории берутся из prefetch_related, набор полей
+        зависит от параметра depth запроса.
+        """
+        serializer_class = self.subcategory_serializers.get(
+            self.context.get("depth"), SubcategorySerializer
+        )
+        return serializer_class(
+            obj.subcategory_set.all(), many=True, read_only=True
         ).data
 
 
 class CategorySerializer(serializers.ModelSerializer):
     """Отображение категорий."""
 
+    picture_srcset = ImageVariantsField(source="picture")
+
     class Meta:
         model = Category
-        fields = ("id", "name", "picture")
+        fields = ("id", "name", "picture", "picture_srcset")
 
 
 class ImageProductSerializer(serializers.ModelSerializer):
     """Отображение изображений продуктов."""
 
+    srcset = ImageVariantsField(source="processed_image")
+
     class Meta:
         model = ImageProduct
-        fields = ("image",)
+        fields = ("image", "srcset")
 
 
 class ProductReadSerializer(serializers.ModelSerializer):
@@ -67,14 +151,150 @@ class ProductReadSerializer(serializers.ModelSerializer):
 
     def get_picture(self, obj):
         return ImageProductSerializer(
-            ImageProduct.objects.filter(product=obj.id),
-            many=True, read_only=True
+            obj.imageproduct_set.all(), many=True, read_only=True
         ).data
 
     def get_category(self, obj):
         return CategorySerializer(obj.subcategory.category).data
 
 
+class ProductValuesSerializer:
+    """
+    Быстрая сериализация продуктов в формат ProductReadSerializer.
+
+    Продукты читаются через values() пачками, изображения - одним
+    запросом на пачку. Поля DRF не создаются, ссылки на файлы и их
+    копии считаются один раз на файл. Запрос не учитывается, поэтому
+    все ссылки относительные.
+    """
+
+    values = (
+        "id",
+        "name",
+        "slug",
+        "price",
+        "subcategory_id",
+        "subcategory__category_id",
+        "subcategory__name",
+        "subcategory__picture",
+        "subcategory__category__name",
+        "subcategory__category__picture",
+    )
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+        self.pictures = {}
+
+    def get_picture(self, field, name, srcset=True):
+        """
+        Ссылка на файл и копии, как у ImageField и ImageVariantsField.
+        Берутся только уже созданные копии: карточки собираются
+        при сохранении в админке, а копии создают фоновые задачи.
+        """
+        key = (field, name, srcset)
+        if key not in self.pictures:
+            if not name:
+                self.pictures[key] = (None, {})
+            elif not srcset:
+                self.pictures[key] = (field.storage.url(name), {})
+            else:
+                field_file = field.attr_class(None, field, name)
+                variants = {
+                    image_format: {
+                        width: field.storage.url(variant)
+                        for width, variant in widths.items()
+                    }
+                    for image_format, widths in find_image_variants(
+                        field_file
+                    ).items()
+                }
+                self.pictures[key] = (field.storage.url(name), variants)
+        return self.pictures[key]
+
+    def iterate(self, chunk_size):
+        """Пары (id продукта, данные) в порядке queryset."""
+        chunk = []
+        for row in self.queryset.values(*self.values).iterator(
+            chunk_size=chunk_size
+        ):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield from self.serialize_chunk(chunk)
+                chunk = []
+        yield from self.serialize_chunk(chunk)
+
+    def serialize_chunk(self, rows):
+        if not rows:
+            return
+        images = {row["id"]: [] for row in rows}
+        for product, image, image_status in ImageProduct.objects.filter(
+            product__in=images
+        ).values_list("product", "image", "status"):
+            images[product].append((image, image_status))
+        image_field = ImageProduct._meta.get_field("image")
+        subcategory_field = Subcategory._meta.get_field("picture")
+        category_field = Category._meta.get_field("picture")
+        for row in rows:
+            subcategory_picture, subcategory_srcset = self.get_picture(
+                subcategory_field, row["subcategory__picture"]
+            )
+            category_picture, category_srcset = self.get_picture(
+                category_field, row["subcategory__category__picture"]
+            )
+            pictures = []
+            for image, image_status in images[row["id"]]:
+                # Копии есть только у обработанных изображений.
+                url, srcset = self.get_picture(
+                    image_field, image,
+                    srcset=image_status == ImageProduct.Status.READY,
+                )
+                pictures.append({"image": url, "srcset": srcset})
+            yield row["id"], {
+                "name": row["name"],
+                "slug": row["slug"],
+                "subcategory": {
+                    "id": row["subcategory_id"],
+                    "category": row["subcategory__category_id"],
+                    "name": row["subcategory__name"],
+                    "picture": subcategory_picture,
+                    "picture_srcset": subcategory_srcset,
+                },
+                "category": {
+                    "id": row["subcategory__category_id"],
+                    "name": row["subcategory__category__name"],
+                    "picture": category_picture,
+                    "picture_srcset": category_srcset,
+                },
+                "price": row["price"],
+                "picture": pictures,
+            }
+
+
+class ProductCardSerializer(serializers.BaseSerializer):
+    """
+    Отображение продуктов из готовых карточек. Ссылки на изображение
+    подкатегории дополняются адресом сервера, как в ProductReadSerializer.
+    Продукт без карточки сериализуется обычным способом.
+    """
+
+    def to_representation(self, instance):
+        try:
+            data = json.loads(instance.card.payload)
+        except ObjectDoesNotExist:
+            data = ProductReadSerializer(instance).data
+        request = self.context.get("request")
+        if request is not None:
+            subcategory = data["subcategory"]
+            if subcategory["picture"]:
+                subcategory["picture"] = request.build_absolute_uri(
+                    subcategory["picture"]
+                )
+            for widths in subcategory["picture_srcset"].values():
+                for width, url in widths.items():
+                    widths[width] = request.build_absolute_uri(url)
+        return data
+
+
 class ShoppingCartUpdateSerializer(serializers.ModelSerializer):
     """Изменение количества продуктов в корзине."""
 
@@ -86,6 +306,13 @@ class ShoppingCartUpdateSerializer(serializers.ModelSerializer):
 
     def validate_amount(self, value):
         if value.isdigit():
+            # Запись идет через update(), а не save(), поэтому верхняя
+            # граница поля модели проверяется здесь.
+            if int(value) > MAX_VALUE_VALIDATOR_AMOUNT:
+                raise serializers.ValidationError(
+                    "Количество не может быть больше "
+                    f"{MAX_VALUE_VALIDATOR_AMOUNT}."
+                )
             return int(value)
         elif value in ("+", "-"):
             return value
@@ -94,10 +321,84 @@ class ShoppingCartUpdateSerializer(serializers.ModelSerializer):
         )
 
 
+class ShoppingCartBulkListSerializer(serializers.ListSerializer):
+    """Проверка и применение пакета изменений корзины."""
+
+    def validate(self, attrs):
+        products = [item["product"] for item in attrs]
+        if len(set(products)) != len(products):
+            raise serializers.ValidationError(
+                "Каждый продукт можно указать в пакете только один раз."
+            )
+        missing = set(products) - set(Product.objects.filter(
+            id__in=products
+        ).values_list("id", flat=True))
+        if missing:
+            raise serializers.ValidationError(
+                f"Продукты не найдены: {sorted(missing)}."
+            )
+        return attrs
+
+    def create(self, validated_data):
+        """
+        Новые количества считаются по текущему содержимому корзины,
+        увеличение останавливается на MAX_VALUE_VALIDATOR_AMOUNT.
+        Затем они записываются одним upsert и одним удалением.
+        """
+        user = validated_data[0]["user"]
+        products = [item["product"] for item in validated_data]
+        with atomic_immediate():
+            current = dict(ShoppingCart.objects.select_for_update().filter(
+                user=user, product__in=products
+            ).values_list("product", "amount"))
+            amounts = {}
+            for item in validated_data:
+                amount = current.get(
+                    item["product"], VALUE_FOR_REMOVING_PRODUCT
+                )
+                if item["amount"] == "+":
+                    amount = min(
+                        amount + CHANGE_VALUE_SHOPPING_CART,
+                        MAX_VALUE_VALIDATOR_AMOUNT
+                    )
+                elif item["amount"] == "-":
+                    amount = max(
+                        amount - CHANGE_VALUE_SHOPPING_CART,
+                        VALUE_FOR_REMOVING_PRODUCT
+                    )
+                else:
+                    amount = item["amount"]
+                amounts[item["product"]] = amount
+            ShoppingCart.objects.filter(user=user, product__in=[
+                product for product, amount in amounts.items()
+                if amount == VALUE_FOR_REMOVING_PRODUCT
+            ]).delete()
+            return ShoppingCart.objects.bulk_create(
+                [
+                    ShoppingCart(user=user, product_id=product, amount=amount)
+                    for product, amount in amounts.items()
+                    if amount != VALUE_FOR_REMOVING_PRODUCT
+                ],
+                update_conflicts=True,
+                unique_fields=("user", "product"),
+                update_fields=("amount",),
+            )
+
+
+class ShoppingCartBulkSerializer(ShoppingCartUpdateSerializer):
+    """Элемент пакетного изменения корзины."""
+
+    product = serializers.IntegerField()
+
+    class Meta(ShoppingCartUpdateSerializer.Meta):
+        fields = ("product", "amount")
+        list_serializer_class = ShoppingCartBulkListSerializer
+
+
 class ShoppingCartReadSerializer(serializers.ModelSerializer):
     """Ответ API для продуктов в корзине."""
 
-    product = ProductReadSerializer(read_only=True)
+    product = ProductCardSerializer(read_only=True)
     price = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
@@ -119,19 +420,22 @@ class ShoppingCartSerializer(serializers.ModelSerializer):
     class Meta:
         model = ShoppingCart
         fields = ("user", "product", "amount")
-
-    def validate(self, data):
-        user = self.context.get("request").user.id
-
-        if ShoppingCart.objects.filter(
-            user=user, product=data["product"]
-        ):
+        validators = ()
+
+    def create(self, validated_data):
+        """
+        Повторное добавление продукта отсекается уникальным
+        ограничением в БД, а не предварительной проверкой.
+        """
+        try:
+            with atomic_immediate():
+                return super().create(validated_data)
+        except IntegrityError:
             raise serializers.ValidationError(
-                {"product": "Нельза добавлять в "
-                 "корзину одинаковые продукты."
+                {"product": ["Нельза добавлять в "
+                             "корзину одинаковые продукты."]
                  }
             )
-        return data
 
     def to_representation(self, instance):
         return ShoppingCartReadSerializer(instance).data
@@ -149,9 +453,7 @@ class ShoppingCartAllProductsSerializer(serializers.Serializer):
 
     def get_products(self, obj):
         """Получение списка всех продуктов в корзине"""
-        return ShoppingCartSerializer(
-            obj, context=self.context, many=True
-        ).data
+        return ShoppingCartReadSerializer(obj, many=True).data
 
     def get_count(self, obj):
         """Получение количества продуктов в корзине."""
@@ -160,3 +462,21 @@ class ShoppingCartAllProductsSerializer(serializers.Serializer):
     def get_total_price(self, obj):
         """Получение общей стоимость продуктов в корзине."""
         return self.context.get("total_price")
+
+
+class OrderItemSerializer(serializers.ModelSerializer):
+    """Продукт в заказе с ценой на момент заказа."""
+
+    class Meta:
+        model = OrderItem
+        fields = ("product", "price", "amount")
+
+
+class OrderSerializer(serializers.ModelSerializer):
+    """Отображение оформленного заказа."""
+
+    items = OrderItemSerializer(many=True, source="item_list")
+
+    class Meta:
+        model = Order
+        fields = ("id", "items", "total_price", "created_at")
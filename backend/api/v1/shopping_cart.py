@@ -0,0 +1,125 @@
+from django.db.models import Case, Count, F, Sum, Value, When
+from django.db.models.functions import Coalesce, Least
+from rest_framework import serializers
+
+from .cache import invalidate_shopping_cart
+from .serializers import ShoppingCartSerializer
+from backend.constants import (
+    CHANGE_VALUE_SHOPPING_CART,
+    MAX_VALUE_VALIDATOR_AMOUNT,
+    VALUE_FOR_REMOVING_PRODUCT
+)
+from backend.db import atomic_immediate
+from shop.models import Order, OrderItem, Product, ShoppingCart
+
+
+class OutOfStock(Exception):
+    """Остатка одного из продуктов не хватает для заказа."""
+
+
+def get_shopping_cart_totals():
+    """Выражения для количества продуктов и общей цены корзины."""
+    return {
+        "count": Count("id"),
+        "total_price": Coalesce(
+            Sum(F("product__price") * F("amount")), Value(0)
+        ),
+    }
+
+
+def add_shopping_cart_product(user, product_id):
+    """Добавление продукта в корзину, ответ ShoppingCartSerializer."""
+    serializer = ShoppingCartSerializer(
+        data={"product": product_id, "user": user.id}
+    )
+    serializer.is_valid(raise_exception=True)
+    serializer.save()
+    invalidate_shopping_cart(user)
+    return serializer.data
+
+
+def change_shopping_cart_amount(user, product_id, amount):
+    """
+    Изменение количества продукта в корзине атомарными запросами.
+    Увеличение останавливается на MAX_VALUE_VALIDATOR_AMOUNT.
+    Возвращает True, если продукт удален из корзины.
+    """
+    cart = ShoppingCart.objects.filter(user=user, product=product_id)
+    deleted = 0
+    with atomic_immediate():
+        if amount == "+":
+            cart.update(amount=Least(
+                F("amount") + CHANGE_VALUE_SHOPPING_CART,
+                Value(MAX_VALUE_VALIDATOR_AMOUNT),
+            ))
+        elif amount == "-":
+            if not cart.filter(
+                amount__gt=CHANGE_VALUE_SHOPPING_CART
+            ).update(
+                amount=F("amount") - CHANGE_VALUE_SHOPPING_CART
+            ):
+                deleted, _ = cart.delete()
+        elif amount == VALUE_FOR_REMOVING_PRODUCT:
+            deleted, _ = cart.delete()
+        else:
+            cart.update(amount=amount)
+    invalidate_shopping_cart(user)
+    return bool(deleted)
+
+
+def checkout_shopping_cart(user):
+    """
+    Оформление заказа из корзины за постоянное число запросов: чтение
+    корзины с ценами, списание остатков одним UPDATE, создание заказа
+    и его продуктов, очистка корзины. Возвращает заказ с item_list.
+    """
+    try:
+        with atomic_immediate():
+            lines = list(
+                ShoppingCart.objects.filter(user=user)
+                .values_list("id", "product_id", "amount", "product__price")
+                .order_by("id")
+            )
+            if not lines:
+                raise serializers.ValidationError("Корзина пуста.")
+            amounts = {product: amount for _, product, amount, _ in lines}
+            # Строка продукта меняется, только если остатка хватает, а
+            # UPDATE проверяет условие на актуальной версии строки.
+            # Параллельные заказы не уводят остаток в минус без
+            # предварительных SELECT ... FOR UPDATE.
+            required = Case(
+                *(When(pk=product, then=Value(amount))
+                  for product, amount in amounts.items())
+            )
+            reserved = Product.objects.filter(
+                pk__in=amounts, stock__gte=required
+            ).update(stock=F("stock") - required)
+            if reserved != len(amounts):
+                raise OutOfStock()
+            order = Order.objects.create(
+                user=user,
+                total_price=sum(
+                    price * amount for _, _, amount, price in lines
+                ),
+            )
+            order.item_list = OrderItem.objects.bulk_create([
+                OrderItem(
+                    order=order, product_id=product, price=price,
+                    amount=amount,
+                )
+                for _, product, amount, price in lines
+            ])
+            ShoppingCart.objects.filter(
+                id__in=[line for line, _, _, _ in lines]
+            ).delete()
+    except OutOfStock:
+        # Списание уже откатилось, остатки читаются после отката.
+        raise serializers.ValidationError({"stock": [
+            f"Недостаточно продукта {name}: доступно {stock}."
+            for name, stock, product in Product.objects.filter(
+                pk__in=amounts
+            ).values_list("name", "stock", "id").order_by("id")
+            if stock < amounts[product]
+        ] or ["Остатки изменились, повторите заказ."]})
+    invalidate_shopping_cart(user)
+    return order
@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+from .cards import build_product_cards
+from shop.models import Category, ImageProduct, Product, Subcategory
+from shop.signals import products_updated
+
+
+def rebuild_product_cards(sender, instance, **kwargs):
+    """Пересборка карточек продуктов, зависящих от измененной записи."""
+    if sender is Product:
+        products = Product.objects.filter(id=instance.id)
+    elif sender is ImageProduct:
+        products = Product.objects.filter(id=instance.product_id)
+    elif sender is Subcategory:
+        products = Product.objects.filter(subcategory=instance)
+    else:
+        products = Product.objects.filter(subcategory__category=instance)
+    build_product_cards(products)
+
+
+def remove_product_image(sender, instance, origin, **kwargs):
+    """
+    При каскадном удалении продукта его карточка уже удалена,
+    пересобирать ее не нужно.
+    """
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if model is ImageProduct:
+        rebuild_product_cards(sender, instance)
+
+
+def rebuild_updated_product_cards(sender, products, **kwargs):
+    build_product_cards(products)
+
+
+def forget_token(sender, instance, **kwargs):
+    """
+    Выход через djoser и удаление токена сбрасывают его в кеше. Сброс
+    выполняется после фиксации: до нее другой процесс еще прочитал бы
+    токен из БД и закешировал его заново.
+    """
+    # После удаления у токена сбрасывается первичный ключ key.
+    keys = (instance.key,)
+    transaction.on_commit(lambda: token_cache.revoke(keys))
+
+
+def forget_user_tokens(sender, instance, update_fields=None, **kwargs):
+    """
+    Изменение пользователя, например is_active, сбрасывает его токены.
+    Обновление last_login при входе токены не затрагивает.
+    """
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    keys = list(Token.objects.filter(user=instance).values_list(
+        "key", flat=True
+    ))
+    if keys:
+        transaction.on_commit(lambda: token_cache.revoke(keys))
+
+
+for model in (Category, Subcategory, Product, ImageProduct):
+    post_save.connect(rebuild_product_cards, sender=model)
+post_delete.connect(remove_product_image, sender=ImageProduct)
+products_updated.connect(rebuild_updated_product_cards)
+post_delete.connect(forget_token, sender=Token)
+post_save.connect(forget_user_tokens, sender=get_user_model())
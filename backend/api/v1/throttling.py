@@ -0,0 +1,132 @@
+import math
+import threading
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+THROTTLE_KEY = "throttle:{scope}:{ident}"
+DURATIONS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+# Состояние корзины токенов - хеш из остатка токенов и времени
+# последнего обновления. Время берется из Redis, чтобы расхождение
+# часов серверов приложения не влияло на пополнение.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call("HMGET", KEYS[1], "tokens", "updated")
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated",
+    tostring(now))
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate))
+return tostring(wait)
+"""
+
+_lock = threading.Lock()
+_script = None
+
+
+def parse_rate(rate):
+    """Строка "число/период" как в DRF: емкость и токенов в секунду."""
+    num, period = rate.split("/")
+    capacity = int(num)
+    return capacity, capacity / DURATIONS[period[0]]
+
+
+def take_token(key, capacity, rate, cache_alias="default"):
+    """
+    Списание токена одной атомарной операцией. Возвращает 0, если
+    запрос разрешен, иначе число секунд до появления токена.
+    """
+    cache = caches[cache_alias]
+    if isinstance(cache, RedisCache):
+        return take_redis_token(cache, key, capacity, rate)
+    if not isinstance(cache, (LocMemCache, DummyCache)):
+        # У Memcached, БД и файлов нет атомарного чтения и записи
+        # корзины, а блокировка ниже действует только в процессе.
+        raise ImproperlyConfigured(
+            f"TokenBucketThrottle не поддерживает {type(cache).__name__}: "
+            "для общего кеша нужен RedisCache."
+        )
+    # LocMemCache не разделяется между процессами, поэтому
+    # атомарности внутри процесса достаточно.
+    with _lock:
+        now = time.time()
+        tokens, updated = cache.get(key) or (capacity, now)
+        tokens = min(capacity, tokens + max(0, now - updated) * rate)
+        wait = 0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        cache.set(key, (tokens, now), math.ceil(capacity / rate))
+    return wait
+
+
+def take_redis_token(cache, key, capacity, rate):
+    global _script
+    key = cache.make_and_validate_key(key)
+    client = cache._cache.get_client(key, write=True)
+    if _script is None:
+        _script = client.register_script(TOKEN_BUCKET_SCRIPT)
+    # EVALSHA одним обращением, текст скрипта отправляется только
+    # если Redis его еще не видел.
+    return float(_script(keys=(key,), args=(capacity, rate), client=client))
+
+
+def get_throttle_wait(request, scope):
+    """
+    Проверка лимита scope из DEFAULT_THROTTLE_RATES: 0, если запрос
+    разрешен или лимит не задан, иначе секунды ожидания. Лимит
+    считается для пользователя, для анонимных - для IP-адреса.
+    """
+    rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+    if rate is None:
+        return 0
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        ident = user.pk
+    else:
+        ident = BaseThrottle().get_ident(request)
+    return take_token(
+        THROTTLE_KEY.format(scope=scope, ident=ident), *parse_rate(rate)
+    )
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Ограничение частоты запросов алгоритмом корзины токенов в общем
+    кеше. Скорость задается в DEFAULT_THROTTLE_RATES по имени действия
+    ViewSet: "add_shopping_cart": "60/min" - до 60 запросов подряд
+    и по одному новому каждую секунду. Действия без скорости
+    не ограничиваются.
+    """
+
+    def __init__(self):
+        self.wait_time = 0
+
+    def allow_request(self, request, view):
+        self.wait_time = get_throttle_wait(
+            request, getattr(view, "action", None)
+        )
+        return not self.wait_time
+
+    def wait(self):
+        # Retry-After выводится целым числом секунд.
+        return math.ceil(self.wait_time)
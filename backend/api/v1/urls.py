@@ -1,6 +1,7 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from . import async_views
 from .views import CategoryViewSet, ProductViewSet
 
 
@@ -8,8 +9,23 @@ router_v_1 = DefaultRouter()
 router_v_1.register("products", ProductViewSet, basename="products")
 router_v_1.register("categories", CategoryViewSet, basename="categories")
 
+async_urlpatterns = [
+    path("products/", async_views.product_list),
+    path("products/shopping_cart/", async_views.shopping_cart),
+    path(
+        "products/clean_all_shopping_cart/",
+        async_views.clean_all_shopping_cart
+    ),
+    path("products/<int:pk>/", async_views.product_detail),
+    path(
+        "products/<int:pk>/add_shopping_cart/",
+        async_views.add_shopping_cart
+    ),
+]
+
 
 urlpatterns = [
+    path("async/", include(async_urlpatterns)),
     path("", include(router_v_1.urls)),
     path("auth/", include("djoser.urls")),
     path("auth/", include("djoser.urls.authtoken")),
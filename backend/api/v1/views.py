@@ -1,44 +1,179 @@
+from django.db.models import Count, Prefetch
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from rest_framework import viewsets, status
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import serializers, viewsets, status
 from rest_framework.decorators import action
-from rest_framework.pagination import (
-    LimitOffsetPagination, PageNumberPagination
-)
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from .cache import (
+    get_cached_shopping_cart,
+    get_shopping_cart_cache_key,
+    invalidate_shopping_cart,
+    set_cached_shopping_cart,
+)
+from .feed import stream_feed
+from .filters import ProductFilterSet, ProductOrderingFilter
+from .mixins import CatalogCacheMixin, ReplicaReadMixin
+from .pagination import (
+    CategoryPagination,
+    ProductPagination,
+    ShoppingCartPagination
+)
 from .serializers import (
     CategoryWithSubcategorySerializer,
-    ProductReadSerializer,
+    OrderSerializer,
+    ProductCardSerializer,
     ShoppingCartAllProductsSerializer,
+    ShoppingCartBulkSerializer,
     ShoppingCartSerializer,
     ShoppingCartUpdateSerializer,
 )
+from .shopping_cart import (
+    add_shopping_cart_product,
+    change_shopping_cart_amount,
+    checkout_shopping_cart,
+    get_shopping_cart_totals,
+)
+from .throttling import TokenBucketThrottle
 from backend.constants import (
-    CHANGE_VALUE_SHOPPING_CART,
-    VALUE_FOR_REMOVING_PRODUCT
+    CATEGORY_DEPTH_COUNT,
+    CATEGORY_DEPTH_PRODUCTS,
+    CATEGORY_TOP_PRODUCTS_LIMIT,
+    SEARCH_RESULTS_LIMIT,
 )
 from shop.models import (
     Category,
     Product,
     ShoppingCart,
+    Subcategory,
 )
+from shop.search import get_search_backend, get_search_terms
 
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CategoryViewSet(
+    ReplicaReadMixin, CatalogCacheMixin, viewsets.ReadOnlyModelViewSet
+):
     """API для отображения категорий с подкатегориями."""
 
-    queryset = Category.objects.all()
+    queryset = Category.objects.order_by("id")
     serializer_class = CategoryWithSubcategorySerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = CategoryPagination
+
+    def get_depth(self):
+        """
+        Получение параметра depth: count добавляет количество продуктов
+        в подкатегориях, products - еще и первые продукты подкатегорий.
+        """
+        depth = self.request.query_params.get("depth")
+        if depth not in (None, CATEGORY_DEPTH_COUNT, CATEGORY_DEPTH_PRODUCTS):
+            raise serializers.ValidationError(
+                {"depth": "Допустимые значения: "
+                 f"{CATEGORY_DEPTH_COUNT}, {CATEGORY_DEPTH_PRODUCTS}."
+                 }
+            )
+        return depth
+
+    def get_queryset(self):
+        """
+        Подкатегории всей страницы загружаются одним запросом,
+        количество и первые продукты - агрегатным и оконным запросами.
+        """
+        depth = self.get_depth()
+        subcategories = Subcategory.objects.order_by("id")
+        if depth is not None:
+            subcategories = subcategories.annotate(
+                products_count=Count("product")
+            )
+        prefetches = [Prefetch("subcategory_set", queryset=subcategories)]
+        if depth == CATEGORY_DEPTH_PRODUCTS:
+            prefetches.append(Prefetch(
+                "subcategory_set__product_set",
+                queryset=Product.objects.order_by("-id")[
+                    :CATEGORY_TOP_PRODUCTS_LIMIT
+                ],
+                to_attr="top_products",
+            ))
+        return super().get_queryset().prefetch_related(*prefetches)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["depth"] = self.get_depth()
+        return context
 
 
-class ProductViewSet(viewsets.ReadOnlyModelViewSet):
+class ProductViewSet(
+    ReplicaReadMixin, CatalogCacheMixin, viewsets.ReadOnlyModelViewSet
+):
     """API для продуктов и обработки корзины."""
 
-    queryset = Product.objects.all()
-    serializer_class = ProductReadSerializer
-    pagination_class = PageNumberPagination
+    queryset = Product.objects.select_related("card").order_by("id")
+    serializer_class = ProductCardSerializer
+    pagination_class = ProductPagination
+    filter_backends = (DjangoFilterBackend, ProductOrderingFilter)
+    filterset_class = ProductFilterSet
+    ordering_fields = ("price", "name")
+    ordering = ("id",)
+    replica_actions = ("list", "retrieve", "search")
+    # Лимиты заданы только для изменений корзины и заказа.
+    throttle_classes = (TokenBucketThrottle,)
+
+    @action(detail=False, methods=("GET",),
+            pagination_class=PageNumberPagination,
+            )
+    def search(self, request):
+        """
+        Поиск продуктов по названию: результаты упорядочены по
+        релевантности, последнее слово ищется по префиксу.
+        """
+        return self.get_cached_response(self.get_search_response, request)
+
+    def get_search_response(self, request):
+        query = request.query_params.get("q", "")
+        if not get_search_terms(query):
+            raise serializers.ValidationError(
+                {"q": "Укажите поисковый запрос."}
+            )
+        product_ids = get_search_backend().search(query, SEARCH_RESULTS_LIMIT)
+        page = self.paginate_queryset(product_ids)
+        products = self.get_queryset().in_bulk(page)
+        serializer = self.get_serializer(
+            [products[pk] for pk in page if pk in products], many=True
+        )
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=("GET",),
+            permission_classes=(IsAuthenticated,),
+            )
+    def feed(self, request):
+        """
+        Выгрузка всего каталога в NDJSON одним запросом. Параметр since
+        оставляет только продукты, измененные начиная с указанного времени.
+        """
+        queryset = Product.objects.select_related(
+            "subcategory__category"
+        ).prefetch_related("imageproduct_set").order_by("updated_at", "id")
+        since = request.query_params.get("since")
+        if since is not None:
+            try:
+                since = parse_datetime(since.replace(" ", "+"))
+            except ValueError:
+                since = None
+            if since is None:
+                raise serializers.ValidationError(
+                    {"since": "Ожидается дата и время в формате ISO 8601."}
+                )
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since, timezone.utc)
+            queryset = queryset.filter(updated_at__gte=since)
+        return StreamingHttpResponse(
+            stream_feed(queryset, request),
+            content_type="application/x-ndjson",
+        )
 
     @action(detail=True, methods=("POST", "PATCH"))
     def add_shopping_cart(self, request, pk):
@@ -47,34 +182,21 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
             serializer = ShoppingCartUpdateSerializer(data=request.data)
             serializer.is_valid(raise_exception=True)
             amount = serializer.validated_data.get("amount")
-            product = get_object_or_404(ShoppingCart, product=pk)
-            if amount == "+":
-                product.amount += CHANGE_VALUE_SHOPPING_CART
-            elif amount == "-":
-                product.amount -= CHANGE_VALUE_SHOPPING_CART
-            else:
-                product.amount = amount
-            if product.amount == VALUE_FOR_REMOVING_PRODUCT:
-                product.delete()
+            if change_shopping_cart_amount(self.request.user, pk, amount):
                 return Response(
                     "Продукт успешно удален из корзины",
                     status=status.HTTP_204_NO_CONTENT
                 )
-            else:
-                product.save()
-                serializer = ShoppingCartSerializer(product)
+            product = get_object_or_404(
+                ShoppingCart.objects.select_related("product__card"),
+                user=self.request.user, product=pk
+            )
+            data = ShoppingCartSerializer(product).data
 
         else:
             product = get_object_or_404(Product, pk=pk).pk
-            serializer = ShoppingCartSerializer(
-                data=(
-                    {"product": product,
-                     "user": self.request.user.id,
-                     }), context={"request": request}
-            )
-            serializer.is_valid(raise_exception=True)
-            serializer.save()
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+            data = add_shopping_cart_product(self.request.user, product)
+        return Response(data, status=status.HTTP_201_CREATED)
 
     @add_shopping_cart.mapping.delete
     def delete_shopping_cart(self, request, pk):
@@ -83,6 +205,7 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
         count_del_objects, _ = ShoppingCart.objects.filter(
             user=user, product=product
         ).delete()
+        invalidate_shopping_cart(user)
 
         if not count_del_objects:
             return Response(
@@ -101,6 +224,7 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
         count_del_objects, _ = ShoppingCart.objects.filter(
             user=self.request.user,
         ).delete()
+        invalidate_shopping_cart(self.request.user)
 
         if not count_del_objects:
             return Response(
@@ -114,20 +238,62 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
         )
 
     @action(detail=False, methods=("GET",),
-            permission_classes=(IsAuthenticated,)
+            permission_classes=(IsAuthenticated,),
+            pagination_class=ShoppingCartPagination,
             )
     def shopping_cart(self, request):
         """
         Отображение всех продуктов и их общей
         цены в корзине пользователя.
         """
-        queryset = ShoppingCart.objects.filter(user=self.request.user)
-        count_products = len(queryset)
-        total_price = sum(
-            (product.product.price*product.amount for product in queryset)
+        key = get_shopping_cart_cache_key(request)
+        data = get_cached_shopping_cart(key)
+        if data is not None:
+            return Response(data, status=status.HTTP_200_OK)
+        response = self.get_shopping_cart_response()
+        set_cached_shopping_cart(key, response.data)
+        return response
+
+    @action(detail=False, methods=("POST",),
+            permission_classes=(IsAuthenticated,),
+            )
+    def checkout(self, request):
+        """
+        Оформление заказа из корзины: цены фиксируются, остатки
+        списываются, корзина очищается.
+        """
+        order = checkout_shopping_cart(request.user)
+        return Response(
+            OrderSerializer(order).data, status=status.HTTP_201_CREATED
         )
+
+    @action(detail=False, methods=("POST", "PATCH"),
+            url_path="shopping_cart/bulk",
+            permission_classes=(IsAuthenticated,),
+            pagination_class=ShoppingCartPagination,
+            )
+    def shopping_cart_bulk(self, request):
+        """
+        Пакетное изменение корзины: список элементов формата
+        {"product": id, "amount": число, "+" или "-"}.
+        """
+        serializer = ShoppingCartBulkSerializer(
+            data=request.data, many=True, allow_empty=False
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user=self.request.user)
+        invalidate_shopping_cart(self.request.user)
+        return self.get_shopping_cart_response()
+
+    def get_shopping_cart_response(self):
+        """Ответ с содержимым корзины, количеством и общей ценой."""
+        queryset = ShoppingCart.objects.filter(user=self.request.user)
+        totals = queryset.aggregate(**get_shopping_cart_totals())
+        queryset = queryset.select_related("product__card").order_by("id")
+        page = self.paginate_queryset(queryset)
         serializer = ShoppingCartAllProductsSerializer(
-            queryset,
-            context={'count': count_products, "total_price": total_price}
+            queryset if page is None else page, context=totals
         )
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
         return Response(serializer.data, status=status.HTTP_200_OK)
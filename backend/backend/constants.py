@@ -1,10 +1,51 @@
+AUTH_TOKEN_CACHE_SIZE = 10000
+AUTH_TOKEN_CACHE_TIMEOUT = 60
+BACKGROUND_TASK_MAX_ATTEMPTS = 3
+BACKGROUND_TASK_NAME_MAX_LENGTH = 64
+BACKGROUND_WORKER_BATCH_SIZE = 10
+BACKGROUND_WORKER_SLEEP = 1
+BENCHMARK_REGRESSION_TOLERANCE = 0.25
+BENCHMARK_REQUESTS = 200
+BENCHMARK_SERVER_CONNECTIONS = 500
+BENCHMARK_SERVER_DURATION = 10
+BENCHMARK_SERVER_START_TIMEOUT = 10
+BENCHMARK_SERVER_THREADS = 8
+BENCHMARK_SERVER_WARMUP = 2
+BENCHMARK_WARMUP = 20
+CATALOG_CACHE_TIMEOUT = 24 * 60 * 60
+CATALOG_IO_BATCH_SIZE = 1000
+CATALOG_IO_PROGRESS_EVERY = 10000
+CATALOG_VERSION_CACHE_TIMEOUT = 5
+CATEGORY_DEPTH_COUNT = "count"
+CATEGORY_DEPTH_PRODUCTS = "products"
 CATEGORY_NAME_MAX_LENGTH = 128
+CATEGORY_TOP_PRODUCTS_LIMIT = 3
 CHANGE_VALUE_SHOPPING_CART = 1
+CURSOR_PAGINATION_MAX_PAGE_SIZE = 100
+IMAGE_MAX_DIMENSION = 2048
+IMAGE_VARIANTS_CACHE_TIMEOUT = 24 * 60 * 60
+IMAGE_VARIANTS_ERROR_CACHE_TIMEOUT = 5 * 60
+IMAGE_VARIANT_QUALITY = 80
+IMAGE_VARIANT_WIDTHS = (160, 320, 640)
 MAX_VALUE_VALIDATOR_AMOUNT = 32000
 MAX_VALUE_VALIDATOR_PRICE = 20000000
+METRICS_DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+METRICS_QUERIES_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
 MIN_VALUE_VALIDATOR_AMOUNT = 1
 MIN_VALUE_VALIDATOR_PRICE = 1
+PERF_PROFILE_INTERVAL = 0.005
+PRODUCT_CARD_CHUNK_SIZE = 1000
+PRODUCT_FEED_CHUNK_SIZE = 1000
 PRODUCT_NAME_FIELD_MAX_LENGTH = 256
 PRODUCT_SLUG_FIELD_MAX_LENGTH = 128
+QUERY_GUARD_THRESHOLD = 5
+SEARCH_MAX_TERMS = 8
+SEARCH_REBUILD_CHUNK_SIZE = 2000
+SEARCH_RESULTS_LIMIT = 100
+SHOPPING_CART_CACHE_TIMEOUT = 60 * 60
+SHOPPING_CART_MAX_PAGE_SIZE = 100
+STATUS_FIELD_MAX_LENGTH = 16
 TAG_CATEGORY_FIELD_MAX_LENGTH = 128
 VALUE_FOR_REMOVING_PRODUCT = 0
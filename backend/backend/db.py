@@ -0,0 +1,43 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Применение PRAGMA из SQLITE_PRAGMAS к новому соединению SQLite."""
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+
+
+@contextmanager
+def atomic_immediate(using=None):
+    """
+    transaction.atomic(), который в SQLite начинает внешнюю транзакцию
+    с BEGIN IMMEDIATE.
+
+    Обычная транзакция SQLite получает блокировку записи только на первой
+    записи. Если до этого было чтение, а другое соединение уже пишет,
+    SQLite сразу возвращает "database is locked" без ожидания
+    busy_timeout. BEGIN IMMEDIATE берет блокировку в начале транзакции
+    и ждет ее как обычно.
+    """
+    connection = transaction.get_connection(using)
+    if connection.vendor != "sqlite" or connection.in_atomic_block:
+        with transaction.atomic(using=using):
+            yield
+        return
+    # В Django 4.2 нет параметра transaction_mode, поэтому BEGIN
+    # подменяется только на время входа во внешний atomic().
+    connection._start_transaction_under_autocommit = lambda: (
+        connection.cursor().execute("BEGIN IMMEDIATE")
+    )
+    try:
+        with transaction.atomic(using=using):
+            del connection._start_transaction_under_autocommit
+            yield
+    finally:
+        connection.__dict__.pop("_start_transaction_under_autocommit", None)
@@ -0,0 +1,164 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from .constants import METRICS_DURATION_BUCKETS, METRICS_QUERIES_BUCKETS
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def format_labels(labels):
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace("\n", "\\n")
+         .replace('"', '\\"'))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Histogram:
+    """Гистограмма Prometheus с метками, данные хранятся в процессе."""
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labels, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self.series.get(labels)
+            if series is None:
+                # Счетчики по границам, счетчик для +Inf и сумма значений.
+                series = self.series[labels] = [0] * (len(self.buckets) + 2)
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def collect(self):
+        with self._lock:
+            series = {labels: list(values) for labels, values in
+                      self.series.items()}
+        for labels, values in sorted(series.items()):
+            names = tuple(zip(self.labels, labels))
+            total = 0
+            for bucket, count in zip(self.buckets, values):
+                total += count
+                yield (
+                    f"{self.name}_bucket"
+                    f"{format_labels(names + (('le', bucket),))} {total}"
+                )
+            total += values[len(self.buckets)]
+            yield (
+                f"{self.name}_bucket"
+                f"{format_labels(names + (('le', '+Inf'),))} {total}"
+            )
+            yield f"{self.name}_sum{format_labels(names)} {values[-1]}"
+            yield f"{self.name}_count{format_labels(names)} {total}"
+
+
+class Counter:
+    """Счетчик Prometheus с метками."""
+
+    type = "counter"
+
+    def __init__(self, name, documentation, labels):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.series = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def inc(self, value, *labels):
+        with self._lock:
+            self.series[labels] += value
+
+    def collect(self):
+        with self._lock:
+            series = dict(self.series)
+        for labels, value in sorted(series.items()):
+            yield (
+                f"{self.name}{format_labels(zip(self.labels, labels))} "
+                f"{value}"
+            )
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Время обработки запроса.",
+    ("view", "method"), METRICS_DURATION_BUCKETS,
+)
+request_db_duration = Histogram(
+    "http_request_db_duration_seconds", "Время запросов к БД за запрос.",
+    ("view", "method"), METRICS_DURATION_BUCKETS,
+)
+request_queries = Histogram(
+    "http_request_queries", "Число запросов к БД за запрос.",
+    ("view", "method"), METRICS_QUERIES_BUCKETS,
+)
+request_duplicate_queries = Counter(
+    "http_request_duplicate_queries_total",
+    "Повторы запросов к БД с теми же SQL и параметрами.",
+    ("view", "method"),
+)
+requests_total = Counter(
+    "http_requests_total", "Число запросов.", ("view", "method", "status"),
+)
+METRICS = [
+    request_duration,
+    request_db_duration,
+    request_queries,
+    request_duplicate_queries,
+    requests_total,
+]
+CACHE_STATS = {}
+
+
+def register_cache_stats(name, stats):
+    """Вывод счетчиков CacheStats на /metrics под меткой cache=name."""
+    CACHE_STATS[name] = stats
+
+
+def render_metrics():
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        lines.extend(metric.collect())
+    for field, documentation in (
+        ("hits", "Попадания в кеш."), ("misses", "Промахи кеша.")
+    ):
+        name = f"cache_{field}_total"
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} counter")
+        for cache, stats in sorted(CACHE_STATS.items()):
+            lines.append(
+                f"{name}{format_labels((('cache', cache),))} "
+                f"{stats.as_dict()[field]}"
+            )
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    """
+    Метрики процесса в текстовом формате Prometheus. Если задан
+    METRICS_TOKEN, нужен заголовок "Authorization: Bearer <токен>",
+    без него метрики доступны только при DEBUG.
+    """
+    if settings.METRICS_TOKEN:
+        allowed = constant_time_compare(
+            request.headers.get("Authorization", ""),
+            f"Bearer {settings.METRICS_TOKEN}",
+        )
+    else:
+        allowed = settings.DEBUG
+    if not allowed:
+        return HttpResponse(status=403)
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
@@ -0,0 +1,351 @@
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from contextlib import ContextDecorator, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .constants import PERF_PROFILE_INTERVAL, QUERY_GUARD_THRESHOLD
+from .metrics import (
+    request_db_duration,
+    request_duplicate_queries,
+    request_duration,
+    request_queries,
+    requests_total,
+)
+
+
+logger = logging.getLogger(__name__)
+
+_query_recorders = ContextVar("query_recorders", default=())
+# Списки IN (%s, %s, ...) разной длины сводятся к одному виду.
+_PLACEHOLDERS = re.compile(r"%s(?:, %s)+")
+
+
+class NPlusOneError(Exception):
+    """Один и тот же по виду запрос повторился QUERY_GUARD_THRESHOLD раз."""
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Выполнено больше запросов к БД, чем допускает query_budget()."""
+
+
+class RequestMetrics:
+    """Время и запросы к БД, выполненные при обработке одного запроса."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.duration = 0
+        self.db_duration = 0
+        self.queries = 0
+        self.statements = Counter()
+
+    @property
+    def duplicate_queries(self):
+        return sum(count - 1 for count in self.statements.values())
+
+    def add_query(self, sql, params, duration):
+        self.queries += 1
+        self.db_duration += duration
+        self.statements[sql, repr(params)] += 1
+
+
+def get_query_shape(sql):
+    """SQL без учета числа параметров в списках."""
+    return _PLACEHOLDERS.sub("%s, ...", sql)
+
+
+@contextmanager
+def record_queries(recorder):
+    """
+    Передача запросов к БД внутри блока в recorder.add_query(). Блоки
+    могут быть вложенными, запрос получают все активные recorder.
+    """
+    token = _query_recorders.set(_query_recorders.get() + (recorder,))
+    try:
+        yield recorder
+    finally:
+        _query_recorders.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """Обертка выполнения SQL, передает запрос активным recorder."""
+    recorders = _query_recorders.get()
+    if not recorders:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        for recorder in recorders:
+            recorder.add_query(sql, params, duration)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """
+    Подключение record_query к новому соединению. Сигнал приходит
+    и при переподключении того же объекта соединения.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class NPlusOneGuard:
+    """
+    Поиск N+1: SELECT одного вида, повторенный threshold раз. В режиме
+    "raise" выбрасывает NPlusOneError, в режиме "log" пишет в лог
+    запрос и стек вызова в коде проекта.
+    """
+
+    def __init__(self, mode, threshold=QUERY_GUARD_THRESHOLD):
+        self.mode = mode
+        self.threshold = threshold
+        self.shapes = Counter()
+
+    def add_query(self, sql, params, duration):
+        if not sql.lstrip().upper().startswith("SELECT"):
+            return
+        shape = get_query_shape(sql)
+        self.shapes[shape] += 1
+        # Сообщение только один раз на каждый вид запроса.
+        if self.shapes[shape] != self.threshold:
+            return
+        message = f"Запрос повторился {self.threshold} раз: {shape}"
+        if self.mode == "raise":
+            raise NPlusOneError(message)
+        logger.warning("%s\n%s", message, "".join(get_project_stack()))
+
+
+def get_project_stack():
+    """Стек вызова без кадров Django, библиотек и этого модуля."""
+    base_dir = str(settings.BASE_DIR)
+    stack = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(base_dir)
+        and frame.filename != __file__
+        and "site-packages" not in frame.filename
+    ]
+    return traceback.format_list(stack or traceback.extract_stack())
+
+
+@contextmanager
+def detect_n_plus_one(mode="raise", threshold=QUERY_GUARD_THRESHOLD):
+    """
+    Проверка N+1 вне запроса, например вокруг serializer.data:
+
+        with detect_n_plus_one():
+            ProductReadSerializer(products, many=True).data
+    """
+    with record_queries(NPlusOneGuard(mode, threshold)) as guard:
+        yield guard
+
+
+class query_budget(ContextDecorator):
+    """
+    Ограничение числа запросов к БД для тестов, контекстный менеджер
+    или декоратор:
+
+        with query_budget(2):
+            client.get("/api/products/")
+
+        @query_budget(3)
+        def test_shopping_cart(self): ...
+    """
+
+    def __init__(self, max_queries):
+        self.max_queries = max_queries
+        self.queries = []
+
+    def _recreate_cm(self):
+        return type(self)(self.max_queries)
+
+    def add_query(self, sql, params, duration):
+        self.queries.append(sql)
+
+    def __enter__(self):
+        self.queries = []
+        self._recording = record_queries(self)
+        self._recording.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self._recording.__exit__(exc_type, exc_value, tb)
+        if exc_type is None and len(self.queries) > self.max_queries:
+            raise QueryBudgetExceeded(
+                f"Выполнено запросов к БД: {len(self.queries)}, "
+                f"допустимо {self.max_queries}:\n"
+                + "\n".join(
+                    f"{number}. {sql}"
+                    for number, sql in enumerate(self.queries, 1)
+                )
+            )
+        return False
+
+
+def get_view_name(request):
+    """
+    Имя представления для меток: класс и действие для ViewSet DRF,
+    имя маршрута для остальных представлений.
+    """
+    match = request.resolver_match
+    if match is None:
+        return "unresolved"
+    view = getattr(match.func, "cls", None)
+    actions = getattr(match.func, "actions", None)
+    if view is not None and actions:
+        action = actions.get(request.method.lower())
+        if action is not None:
+            return f"{view.__name__}.{action}"
+    if view is not None:
+        return view.__name__
+    return match.view_name
+
+
+class StackSampler:
+    """
+    Семплирующий профилировщик: фоновый поток через равные промежутки
+    снимает стеки потоков, обрабатывающих запросы.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.samples = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self, thread_id):
+        with self._lock:
+            self.samples[thread_id] = Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self.run, name="stack-sampler", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self, thread_id):
+        with self._lock:
+            return self.samples.pop(thread_id)
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, samples in self.samples.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        samples[format_stack(frame)] += 1
+
+
+def format_stack(frame):
+    """Стек в формате collapsed stacks для flamegraph: от корня к вершине."""
+    names = []
+    while frame is not None:
+        names.append(
+            f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+        )
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+sampler = StackSampler(PERF_PROFILE_INTERVAL)
+
+
+def save_profile(request, view, metrics, samples):
+    logger.warning(
+        "Медленный запрос %s %s (%s): %.1f мс, БД %.1f мс, запросов %s",
+        request.method, request.path, view, metrics.duration * 1000,
+        metrics.db_duration * 1000, metrics.queries,
+    )
+    if not settings.PERF_PROFILE_DIR or not samples:
+        return
+    os.makedirs(settings.PERF_PROFILE_DIR, exist_ok=True)
+    path = os.path.join(
+        settings.PERF_PROFILE_DIR, f"{time.time_ns()}-{view}.folded"
+    )
+    with open(path, "w", encoding="utf-8") as file:
+        for stack, count in samples.most_common():
+            file.write(f"{stack} {count}\n")
+
+
+class PerformanceMiddleware:
+    """
+    Замер времени запроса, времени и числа запросов к БД с записью
+    в метрики /metrics и заголовок Server-Timing. Синхронные запросы
+    дольше PERF_PROFILE_THRESHOLD миллисекунд сохраняются с профилем.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        profile = settings.PERF_PROFILE_THRESHOLD > 0
+        if profile:
+            sampler.start(threading.get_ident())
+        try:
+            with self.record_queries(metrics):
+                response = self.get_response(request)
+        finally:
+            samples = sampler.stop(threading.get_ident()) if profile else None
+        view = self.finish(request, response, metrics)
+        if profile and (
+            metrics.duration * 1000 >= settings.PERF_PROFILE_THRESHOLD
+        ):
+            save_profile(request, view, metrics, samples)
+        return response
+
+    async def __acall__(self, request):
+        # Поток цикла событий выполняет и другие запросы, поэтому
+        # асинхронные запросы не профилируются.
+        metrics = RequestMetrics()
+        with self.record_queries(metrics):
+            response = await self.get_response(request)
+        self.finish(request, response, metrics)
+        return response
+
+    @contextmanager
+    def record_queries(self, metrics):
+        with record_queries(metrics):
+            if settings.QUERY_GUARD == "off":
+                yield
+                return
+            with record_queries(NPlusOneGuard(settings.QUERY_GUARD)):
+                yield
+
+    def finish(self, request, response, metrics):
+        metrics.duration = time.perf_counter() - metrics.started
+        view = get_view_name(request)
+        request_duration.observe(metrics.duration, view, request.method)
+        request_db_duration.observe(metrics.db_duration, view, request.method)
+        request_queries.observe(metrics.queries, view, request.method)
+        request_duplicate_queries.inc(
+            metrics.duplicate_queries, view, request.method
+        )
+        requests_total.inc(
+            1, view, request.method, response.status_code
+        )
+        if settings.PERF_SERVER_TIMING:
+            response.headers["Server-Timing"] = (
+                f"app;dur={metrics.duration * 1000:.1f}, "
+                f"db;dur={metrics.db_duration * 1000:.1f};"
+                f'desc="{metrics.queries} queries, '
+                f'{metrics.duplicate_queries} duplicates"'
+            )
+        return view
@@ -0,0 +1,47 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+REPLICA_APP_LABELS = ("api", "shop")
+REPLICA_DB_ALIAS = "replica"
+
+_read_from_replica = ContextVar("read_from_replica", default=False)
+
+
+@contextmanager
+def read_from_replica(enabled=True):
+    """Чтение из реплики для запросов внутри блока."""
+    token = _read_from_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+def replica_enabled():
+    """Чтение идет внутри read_from_replica() и реплика настроена."""
+    return _read_from_replica.get() and REPLICA_DB_ALIAS in settings.DATABASES
+
+
+class PrimaryReplicaRouter:
+    """
+    Запись и чтение по умолчанию идут в основную БД, поэтому после
+    изменения корзины ее содержимое читается без задержки репликации.
+    В реплику уходит только чтение моделей каталога внутри
+    read_from_replica(), если реплика настроена. Пользователи и токены
+    всегда читаются из основной БД.
+    """
+
+    def db_for_read(self, model, **hints):
+        if replica_enabled() and model._meta.app_label in REPLICA_APP_LABELS:
+            return REPLICA_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
@@ -15,7 +15,9 @@ SECRET_KEY = os.getenv(
 
 DEBUG = os.getenv("DEBUG", "False") == "True"
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [
+    host for host in os.getenv("ALLOWED_HOSTS", "").split(",") if host
+]
 
 INSTALLED_APPS = [
     'django.contrib.admin',
@@ -33,6 +35,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "backend.performance.PerformanceMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -63,9 +66,56 @@ TEMPLATES = [
 WSGI_APPLICATION = 'backend.wsgi.application'
 
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+    "default": {
+        "ENGINE": os.getenv("DB_ENGINE", "django.db.backends.sqlite3"),
+        "NAME": os.getenv("DB_NAME", BASE_DIR / "db.sqlite3"),
+        "USER": os.getenv("DB_USER", ""),
+        "PASSWORD": os.getenv("DB_PASSWORD", ""),
+        "HOST": os.getenv("DB_HOST", ""),
+        "PORT": os.getenv("DB_PORT", ""),
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", 0)),
+        "CONN_HEALTH_CHECKS": os.getenv("DB_CONN_HEALTH_CHECKS") == "True",
+        # Пулер в режиме транзакций (PgBouncer) не поддерживает
+        # серверные курсоры, которые использует iterator().
+        "DISABLE_SERVER_SIDE_CURSORS": os.getenv("DB_POOLED") == "True",
+    }
+}
+
+if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+    # Тестовая БД в файле: общая БД SQLite в памяти не ждет блокировку
+    # записи, и тесты с параллельными запросами получают ошибки.
+    DATABASES["default"]["TEST"] = {"NAME": BASE_DIR / "test_db.sqlite3"}
+
+if os.getenv("DB_REPLICA_HOST") or os.getenv("DB_REPLICA_NAME"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        # Пустые строки из .env означают значения основной БД.
+        "NAME": os.getenv("DB_REPLICA_NAME") or DATABASES["default"]["NAME"],
+        "HOST": os.getenv("DB_REPLICA_HOST") or DATABASES["default"]["HOST"],
+        "PORT": os.getenv("DB_REPLICA_PORT") or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["backend.routers.PrimaryReplicaRouter"]
+
+# Профиль SQLite для установки на одном сервере: WAL позволяет читать
+# во время записи, synchronous=NORMAL в режиме WAL не теряет
+# целостность, а только последние транзакции при сбое питания.
+SQLITE_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "busy_timeout": int(os.getenv("DB_SQLITE_BUSY_TIMEOUT", 5000)),
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+    "temp_store": "memory",
+} if os.getenv("DB_SQLITE_TUNING", "True") == "True" else {}
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
     }
 }
 
@@ -85,15 +135,30 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+CART_THROTTLE_RATE = os.getenv("CART_THROTTLE_RATE", "60/min")
+CHECKOUT_THROTTLE_RATE = os.getenv("CHECKOUT_THROTTLE_RATE", "10/min")
+
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "api.v1.authentication.CachingTokenAuthentication",
+    ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.v1.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 5,
+    # Лимиты TokenBucketThrottle по действиям ProductViewSet.
+    "DEFAULT_THROTTLE_RATES": {
+        "add_shopping_cart": CART_THROTTLE_RATE,
+        "delete_shopping_cart": CART_THROTTLE_RATE,
+        "clean_all_shopping_cart": CART_THROTTLE_RATE,
+        "shopping_cart_bulk": CART_THROTTLE_RATE,
+        "checkout": CHECKOUT_THROTTLE_RATE,
+    },
 }
 
 
@@ -111,4 +176,17 @@ STATIC_ROOT = "/static/static/"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+IMAGE_VARIANT_FORMATS = ("jpeg", "webp")
+
+BACKGROUND_TASKS_BACKEND = os.getenv("BACKGROUND_TASKS_BACKEND", "process")
+BACKGROUND_TASKS_WORKERS = int(os.getenv("BACKGROUND_TASKS_WORKERS", 2))
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+PERF_SERVER_TIMING = os.getenv("PERF_SERVER_TIMING", "True") == "True"
+# Порог в миллисекундах для профилирования запросов, 0 - отключено.
+PERF_PROFILE_THRESHOLD = int(os.getenv("PERF_PROFILE_THRESHOLD", 0))
+PERF_PROFILE_DIR = os.getenv("PERF_PROFILE_DIR", "")
+# Поиск N+1 в запросах: off, log или raise.
+QUERY_GUARD = os.getenv("QUERY_GUARD", "log" if DEBUG else "off")
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
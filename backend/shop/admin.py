@@ -1,6 +1,13 @@
 from django.contrib import admin
 
-from .models import Category, ImageProduct, Product, Subcategory
+from .models import (
+    Category,
+    ImageProduct,
+    Order,
+    OrderItem,
+    Product,
+    Subcategory,
+)
 
 
 class ImageProductInline(admin.StackedInline):
@@ -9,6 +16,7 @@ class ImageProductInline(admin.StackedInline):
     model = ImageProduct
     extra = 1
     max_num = 3
+    readonly_fields = ("status",)
 
 
 class ProductAdmin(admin.ModelAdmin):
@@ -18,6 +26,7 @@ class ProductAdmin(admin.ModelAdmin):
         "name",
         "slug",
         "price",
+        "stock",
         "subcategory",
     )
 
@@ -26,6 +35,28 @@ class ProductAdmin(admin.ModelAdmin):
     list_display_links = ("name",)
 
 
+class OrderItemInline(admin.TabularInline):
+    """Продукты заказа."""
+
+    model = OrderItem
+    extra = 0
+    raw_id_fields = ("product",)
+
+
+class OrderAdmin(admin.ModelAdmin):
+    """Просмотр заказов."""
+    inlines = (OrderItemInline,)
+    list_display = (
+        "id",
+        "user",
+        "total_price",
+        "created_at",
+    )
+    list_select_related = ("user",)
+    raw_id_fields = ("user",)
+
+
 admin.site.register(Category)
+admin.site.register(Order, OrderAdmin)
 admin.site.register(Product, ProductAdmin)
 admin.site.register(Subcategory)
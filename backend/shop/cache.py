@@ -0,0 +1,66 @@
+import time
+
+from django.db import router, transaction
+from django.db.models import F
+
+from .models import CatalogVersion
+from backend.constants import CATALOG_VERSION_CACHE_TIMEOUT
+from backend.routers import REPLICA_DB_ALIAS
+
+
+# Версия, прочитанная процессом, и время, до которого она считается
+# актуальной.
+_catalog_version = (None, 0)
+
+
+def get_catalog_version():
+    """
+    Получение версии каталога.
+
+    Версия хранится в CatalogVersion в основной БД и общая для всех
+    процессов, в том числе для фоновых задач. Процесс помнит ее
+    CATALOG_VERSION_CACHE_TIMEOUT секунд, поэтому изменение в другом
+    процессе становится видно не позже чем через это время.
+    """
+    version, expires = _catalog_version
+    if time.monotonic() >= expires:
+        version = remember_catalog_version(
+            CatalogVersion.objects.using(
+                router.db_for_write(CatalogVersion)
+            ).values_list("version", flat=True).first() or 0
+        )
+    return version
+
+
+def remember_catalog_version(version):
+    global _catalog_version
+    _catalog_version = (
+        version, time.monotonic() + CATALOG_VERSION_CACHE_TIMEOUT
+    )
+    return version
+
+
+def forget_catalog_version():
+    """Следующий get_catalog_version() прочитает версию из БД."""
+    global _catalog_version
+    _catalog_version = (None, 0)
+
+
+def bump_catalog_version():
+    """Смена версии каталога после изменения его моделей."""
+    using = router.db_for_write(CatalogVersion)
+    versions = CatalogVersion.objects.using(using)
+    with transaction.atomic(using=using):
+        if not versions.update(version=F("version") + 1):
+            versions.create(version=1)
+        remember_catalog_version(
+            versions.values_list("version", flat=True).first()
+        )
+
+
+def replica_has_catalog_version(version):
+    """Реплика уже получила изменения каталога, выпустившие version."""
+    replica_version = CatalogVersion.objects.using(
+        REPLICA_DB_ALIAS
+    ).values_list("version", flat=True).first()
+    return replica_version is not None and replica_version >= version
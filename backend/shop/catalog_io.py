@@ -0,0 +1,234 @@
+import csv
+import json
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_slug
+from django.db import router, transaction
+
+from backend.constants import (
+    MAX_VALUE_VALIDATOR_PRICE,
+    MIN_VALUE_VALIDATOR_PRICE,
+)
+from .models import Category, Product, Subcategory
+from .search import get_search_backend
+from .signals import products_updated
+
+
+CATALOG_FIELDS = ("type", "slug", "name", "parent", "price", "picture")
+CATALOG_FORMATS = ("csv", "jsonl")
+CATEGORY, SUBCATEGORY, PRODUCT = "category", "subcategory", "product"
+
+
+def get_catalog_format(path, catalog_format=None):
+    """Формат файла: из параметра или по расширению."""
+    if catalog_format:
+        return catalog_format
+    if path.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return "csv"
+
+
+def read_rows(file, catalog_format):
+    """
+    Построчное чтение каталога без загрузки файла в память: номер
+    строки в файле и сама строка. Строки JSONL разбираются в parse_row(),
+    чтобы ошибка в одной строке не прерывала чтение файла.
+    """
+    if catalog_format == "jsonl":
+        return (
+            (line_number, line)
+            for line_number, line in enumerate(file, 1) if line.strip()
+        )
+    reader = csv.DictReader(file)
+    return ((reader.line_num, row) for row in reader)
+
+
+def parse_row(row):
+    """Строка каталога как словарь или ValidationError."""
+    if isinstance(row, str):
+        try:
+            row = json.loads(row)
+        except ValueError as error:
+            raise ValidationError(f"Неверный JSON: {error}.")
+    if not isinstance(row, dict):
+        raise ValidationError(
+            f"Строка должна быть объектом, получено: {type(row).__name__}."
+        )
+    return row
+
+
+class RowWriter:
+    """Построчная запись каталога в CSV или JSONL."""
+
+    def __init__(self, file, catalog_format):
+        self.file = file
+        self.catalog_format = catalog_format
+        if catalog_format == "csv":
+            self.writer = csv.DictWriter(file, fieldnames=CATALOG_FIELDS)
+            self.writer.writeheader()
+
+    def write(self, row):
+        if self.catalog_format == "jsonl":
+            self.file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        else:
+            self.writer.writerow(row)
+
+
+class Throughput:
+    """Подсчет строк и скорости обработки."""
+
+    def __init__(self):
+        self.rows = 0
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.rows} строк за {self.elapsed:.1f} с "
+            f"({self.rate:.0f} строк/с)"
+        )
+
+
+class CatalogImporter:
+    """
+    Пакетная загрузка каталога с обновлением записей по слагу.
+
+    Строки копятся в буферах по типам и записываются через
+    bulk_create(update_conflicts=True). Родительские записи берутся из
+    словарей слаг -> id; если родитель еще в буфере, буфер сначала
+    записывается. Каждый буфер записывается в своей транзакции. В памяти
+    держатся только буферы и словари категорий и подкатегорий.
+    """
+
+    models = {CATEGORY: Category, SUBCATEGORY: Subcategory, PRODUCT: Product}
+    update_fields = {
+        CATEGORY: ("name", "picture"),
+        SUBCATEGORY: ("name", "category", "picture"),
+        PRODUCT: ("name", "subcategory", "price", "updated_at"),
+    }
+    product_lookups = {
+        CATEGORY: "subcategory__category__slug__in",
+        SUBCATEGORY: "subcategory__slug__in",
+    }
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.ids = {
+            CATEGORY: dict(Category.objects.values_list("slug", "id")),
+            SUBCATEGORY: dict(Subcategory.objects.values_list("slug", "id")),
+        }
+        self.buffers = {CATEGORY: {}, SUBCATEGORY: {}, PRODUCT: {}}
+        self.counts = {CATEGORY: 0, SUBCATEGORY: 0, PRODUCT: 0}
+        self.search_backend = get_search_backend(
+            router.db_for_write(Product)
+        )
+
+    def add(self, row):
+        """Проверка строки и добавление ее в буфер своего типа."""
+        row_type = row.get("type")
+        if row_type not in self.buffers:
+            raise ValidationError(f"Неизвестный тип строки: {row_type!r}.")
+        slug = row.get("slug") or ""
+        validate_slug(slug)
+        if not row.get("name"):
+            raise ValidationError("Не указано название.")
+        if row_type == CATEGORY:
+            instance = Category(
+                slug=slug, name=row["name"], picture=row.get("picture") or ""
+            )
+        elif row_type == SUBCATEGORY:
+            instance = Subcategory(
+                slug=slug, name=row["name"],
+                category_id=self.get_parent_id(CATEGORY, row.get("parent")),
+                picture=row.get("picture") or "",
+            )
+        else:
+            instance = Product(
+                slug=slug, name=row["name"],
+                subcategory_id=self.get_parent_id(
+                    SUBCATEGORY, row.get("parent")
+                ),
+                price=self.get_price(row.get("price")),
+            )
+        buffer = self.buffers[row_type]
+        buffer[slug] = instance
+        if len(buffer) >= self.batch_size:
+            self.flush(row_type)
+
+    def get_parent_id(self, parent_type, slug):
+        ids = self.ids[parent_type]
+        if slug not in ids and slug in self.buffers[parent_type]:
+            self.flush(parent_type)
+        if slug not in ids:
+            raise ValidationError(f"Не найден родитель {slug!r}.")
+        return ids[slug]
+
+    def get_price(self, value):
+        try:
+            price = int(value)
+        except (TypeError, ValueError):
+            raise ValidationError(f"Неверная цена: {value!r}.")
+        if not MIN_VALUE_VALIDATOR_PRICE <= price <= MAX_VALUE_VALIDATOR_PRICE:
+            raise ValidationError(f"Цена вне допустимого диапазона: {price}.")
+        return price
+
+    def flush(self, row_type):
+        """Запись буфера одним upsert и обновление словарей слагов."""
+        buffer = self.buffers[row_type]
+        if not buffer:
+            return
+        model = self.models[row_type]
+        with transaction.atomic(using=router.db_for_write(model)):
+            model.objects.bulk_create(
+                buffer.values(),
+                update_conflicts=True,
+                unique_fields=("slug",),
+                update_fields=self.update_fields[row_type],
+            )
+            saved = model.objects.filter(slug__in=buffer)
+            if row_type == PRODUCT:
+                self.search_backend.index(saved.only("id", "name"))
+                products = saved
+            else:
+                self.ids[row_type].update(saved.values_list("slug", "id"))
+                products = Product.objects.filter(
+                    **{self.product_lookups[row_type]: buffer}
+                )
+            products_updated.send(sender=Product, products=products)
+        self.counts[row_type] += len(buffer)
+        buffer.clear()
+
+    def finish(self):
+        for row_type in (CATEGORY, SUBCATEGORY, PRODUCT):
+            self.flush(row_type)
+
+
+def export_rows(chunk_size):
+    """Строки каталога: категории, подкатегории, затем продукты."""
+    for slug, name, picture in Category.objects.order_by("id").values_list(
+        "slug", "name", "picture"
+    ).iterator(chunk_size=chunk_size):
+        yield {"type": CATEGORY, "slug": slug, "name": name,
+               "parent": "", "price": "", "picture": picture}
+    for slug, name, parent, picture in Subcategory.objects.order_by(
+        "id"
+    ).values_list(
+        "slug", "name", "category__slug", "picture"
+    ).iterator(chunk_size=chunk_size):
+        yield {"type": SUBCATEGORY, "slug": slug, "name": name,
+               "parent": parent, "price": "", "picture": picture}
+    for slug, name, parent, price in Product.objects.order_by(
+        "id"
+    ).values_list(
+        "slug", "name", "subcategory__slug", "price"
+    ).iterator(chunk_size=chunk_size):
+        yield {"type": PRODUCT, "slug": slug, "name": name,
+               "parent": parent, "price": price, "picture": ""}
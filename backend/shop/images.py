@@ -0,0 +1,146 @@
+import hashlib
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from backend.constants import (
+    IMAGE_VARIANTS_CACHE_TIMEOUT,
+    IMAGE_VARIANTS_ERROR_CACHE_TIMEOUT,
+    IMAGE_VARIANT_QUALITY,
+    IMAGE_VARIANT_WIDTHS,
+)
+
+
+IMAGE_VARIANTS_DIR = "variants"
+IMAGE_VARIANTS_KEY = "image:variants:{name}"
+IMAGE_VARIANT_EXTENSIONS = {"jpeg": "jpg", "webp": "webp", "avif": "avif"}
+
+
+def get_content_hash(field_file):
+    """SHA-256 содержимого файла изображения."""
+    digest = hashlib.sha256()
+    with field_file.open("rb") as file:
+        for chunk in file.chunks():
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_variant_formats():
+    """Форматы из настроек, которые поддерживает установленный Pillow."""
+    Image.init()
+    return [
+        image_format for image_format in settings.IMAGE_VARIANT_FORMATS
+        if image_format.upper() in Image.SAVE
+    ]
+
+
+def get_variants_dir(digest):
+    """Каталог копий изображения с хешем содержимого digest."""
+    return f"{IMAGE_VARIANTS_DIR}/{digest[:2]}/{digest}"
+
+
+def encode_variant(image, width, image_format):
+    """Уменьшение изображения до ширины width и кодирование в формат."""
+    height = max(round(image.height * width / image.width), 1)
+    variant = image.resize((width, height), Image.Resampling.LANCZOS)
+    if image_format == "jpeg" and variant.mode != "RGB":
+        variant = variant.convert("RGB")
+    buffer = BytesIO()
+    variant.save(
+        buffer, image_format.upper(), quality=IMAGE_VARIANT_QUALITY
+    )
+    return ContentFile(buffer.getvalue())
+
+
+def generate_variants(field_file):
+    """
+    Создание уменьшенных копий изображения во всех форматах.
+
+    Пути копий строятся из хеша содержимого, поэтому повторный вызов
+    для того же изображения ничего не пересоздает. Возвращает словарь
+    {формат: {ширина: путь в хранилище}}.
+    """
+    storage = field_file.storage
+    digest = get_content_hash(field_file)
+    variants = {}
+    with field_file.open("rb"), Image.open(field_file) as original:
+        image = ImageOps.exif_transpose(original)
+        widths = [
+            width for width in IMAGE_VARIANT_WIDTHS if width < image.width
+        ] or [image.width]
+        for image_format in get_variant_formats():
+            variants[image_format] = {}
+            for width in widths:
+                name = (
+                    f"{get_variants_dir(digest)}/{width}."
+                    f"{IMAGE_VARIANT_EXTENSIONS[image_format]}"
+                )
+                if not storage.exists(name):
+                    name = storage.save(
+                        name, encode_variant(image, width, image_format)
+                    )
+                variants[image_format][str(width)] = name
+    return variants
+
+
+def get_image_variants(field_file):
+    """
+    Копии изображения из кеша; при первом обращении они создаются.
+    Ошибка чтения файла кешируется ненадолго, чтобы не повторять ее
+    на каждом запросе.
+    """
+    if not field_file:
+        return {}
+    key = IMAGE_VARIANTS_KEY.format(name=field_file.name)
+    variants = cache.get(key)
+    if variants is None:
+        try:
+            variants = generate_variants(field_file)
+        except (
+            Image.DecompressionBombError,
+            OSError,
+            UnidentifiedImageError,
+            ValueError,
+        ):
+            cache.set(key, {}, IMAGE_VARIANTS_ERROR_CACHE_TIMEOUT)
+            return {}
+        cache.set(key, variants, IMAGE_VARIANTS_CACHE_TIMEOUT)
+    return variants
+
+
+def find_image_variants(field_file):
+    """
+    Уже созданные копии изображения в том же формате, что
+    у get_image_variants(), без декодирования и создания копий. Пустой
+    словарь, если копий еще нет: их создаст фоновая задача.
+    """
+    if not field_file:
+        return {}
+    key = IMAGE_VARIANTS_KEY.format(name=field_file.name)
+    variants = cache.get(key)
+    if variants is not None:
+        return variants
+    storage = field_file.storage
+    try:
+        directory = get_variants_dir(get_content_hash(field_file))
+        _, files = storage.listdir(directory)
+    except OSError:
+        return {}
+    widths = {}
+    for file in files:
+        width, _, extension = file.partition(".")
+        widths.setdefault(extension, []).append(width)
+    variants = {}
+    for image_format in get_variant_formats():
+        extension = IMAGE_VARIANT_EXTENSIONS[image_format]
+        if extension in widths:
+            variants[image_format] = {
+                width: f"{directory}/{width}.{extension}"
+                for width in sorted(widths[extension], key=int)
+            }
+    if variants:
+        cache.set(key, variants, IMAGE_VARIANTS_CACHE_TIMEOUT)
+    return variants
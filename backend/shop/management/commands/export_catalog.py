@@ -0,0 +1,46 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from backend.constants import CATALOG_IO_BATCH_SIZE, CATALOG_IO_PROGRESS_EVERY
+from shop.catalog_io import (
+    CATALOG_FORMATS,
+    RowWriter,
+    Throughput,
+    export_rows,
+    get_catalog_format,
+)
+
+
+class Command(BaseCommand):
+    help = "Выгружает категории, подкатегории и продукты в CSV или JSONL."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Путь к файлу или - для stdout.")
+        parser.add_argument("--format", choices=CATALOG_FORMATS)
+        parser.add_argument(
+            "--chunk-size", type=int, default=CATALOG_IO_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--progress-every", type=int, default=CATALOG_IO_PROGRESS_EVERY,
+            help="Выводить прогресс каждые N строк.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file = (
+            sys.stdout if path == "-"
+            else open(path, "w", encoding="utf-8", newline="")
+        )
+        writer = RowWriter(file, get_catalog_format(path, options["format"]))
+        throughput = Throughput()
+        try:
+            for row in export_rows(options["chunk_size"]):
+                writer.write(row)
+                throughput.rows += 1
+                if throughput.rows % options["progress_every"] == 0:
+                    self.stderr.write(f"Выгружено {throughput}")
+        finally:
+            if file is not sys.stdout:
+                file.close()
+        self.stderr.write(self.style.SUCCESS(f"Выгружено {throughput}."))
@@ -0,0 +1,77 @@
+import sys
+from contextlib import nullcontext
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from backend.constants import CATALOG_IO_BATCH_SIZE, CATALOG_IO_PROGRESS_EVERY
+from shop.cache import bump_catalog_version
+from shop.catalog_io import (
+    CATALOG_FORMATS,
+    CatalogImporter,
+    Throughput,
+    get_catalog_format,
+    parse_row,
+    read_rows,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Загружает категории, подкатегории и продукты из CSV или JSONL, "
+        "обновляя существующие записи по слагу."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Путь к файлу или - для stdin.")
+        parser.add_argument("--format", choices=CATALOG_FORMATS)
+        parser.add_argument(
+            "--batch-size", type=int, default=CATALOG_IO_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--progress-every", type=int, default=CATALOG_IO_PROGRESS_EVERY,
+            help="Выводить прогресс каждые N строк.",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Проверить файл и откатить все изменения.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        catalog_format = get_catalog_format(path, options["format"])
+        file = (
+            sys.stdin if path == "-"
+            else open(path, encoding="utf-8", newline="")
+        )
+        throughput = Throughput()
+        errors = 0
+        with file, (
+            transaction.atomic() if options["dry_run"] else nullcontext()
+        ):
+            importer = CatalogImporter(options["batch_size"])
+            for line_number, row in read_rows(file, catalog_format):
+                try:
+                    importer.add(parse_row(row))
+                except ValidationError as error:
+                    errors += 1
+                    self.stderr.write(
+                        f"Строка {line_number}: {' '.join(error.messages)}"
+                    )
+                throughput.rows += 1
+                if throughput.rows % options["progress_every"] == 0:
+                    self.stdout.write(f"Обработано {throughput}")
+            importer.finish()
+            if options["dry_run"]:
+                transaction.set_rollback(True)
+        if not options["dry_run"]:
+            bump_catalog_version()
+        counts = ", ".join(
+            f"{row_type}: {count}"
+            for row_type, count in importer.counts.items()
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Проверено' if options['dry_run'] else 'Загружено'} "
+            f"{throughput}. {counts}. Ошибок: {errors}."
+        ))
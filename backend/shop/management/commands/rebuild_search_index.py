@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import router
+
+from shop.models import Product
+from shop.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Перестраивает поисковый индекс продуктов."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend(router.db_for_write(Product))
+        backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Поисковый индекс перестроен ({type(backend).__name__})."
+        ))
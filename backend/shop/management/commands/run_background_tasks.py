@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.constants import (
+    BACKGROUND_WORKER_BATCH_SIZE,
+    BACKGROUND_WORKER_SLEEP,
+)
+from shop.tasks import run_database_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        "Выполняет фоновые задачи из таблицы очереди "
+        "(BACKGROUND_TASKS_BACKEND=database)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Разобрать очередь и завершиться.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=BACKGROUND_WORKER_BATCH_SIZE,
+            help="Количество задач, захватываемых за один раз.",
+        )
+        parser.add_argument(
+            "--sleep", type=float, default=BACKGROUND_WORKER_SLEEP,
+            help="Пауза в секундах, когда очередь пуста.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed = run_database_tasks(options["batch_size"])
+            if processed:
+                self.stdout.write(f"Выполнено задач: {processed}")
+            elif options["once"]:
+                break
+            else:
+                time.sleep(options["sleep"])
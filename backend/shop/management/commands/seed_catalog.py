@@ -0,0 +1,231 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router, transaction
+from rest_framework.authtoken.models import Token
+
+from backend.constants import (
+    CATALOG_IO_BATCH_SIZE,
+    MAX_VALUE_VALIDATOR_AMOUNT,
+    MAX_VALUE_VALIDATOR_PRICE,
+    MIN_VALUE_VALIDATOR_PRICE,
+    SEARCH_REBUILD_CHUNK_SIZE,
+)
+from shop.cache import bump_catalog_version
+from shop.catalog_io import Throughput
+from shop.models import (
+    Category,
+    ImageProduct,
+    Product,
+    ShoppingCart,
+    Subcategory,
+)
+from shop.search import get_search_backend
+from shop.signals import products_updated
+
+
+User = get_user_model()
+
+CATEGORY_NAMES = (
+    "Овощи", "Фрукты", "Молочные продукты", "Мясо", "Рыба", "Хлеб",
+    "Напитки", "Бакалея", "Сладости", "Заморозка",
+)
+SUBCATEGORY_NAMES = (
+    "Свежие", "Замороженные", "Фермерские", "Импортные", "Сезонные",
+    "Органические", "Готовые", "Детские",
+)
+PRODUCT_ADJECTIVES = (
+    "Спелый", "Свежий", "Домашний", "Отборный", "Сочный", "Хрустящий",
+    "Сладкий", "Нежный", "Копченый", "Ароматный",
+)
+PRODUCT_NOUNS = (
+    "авокадо", "апельсин", "банан", "батон", "йогурт", "кефир", "лосось",
+    "огурец", "персик", "сыр", "творог", "томат", "чай", "шоколад",
+)
+# Несколько общих файлов, чтобы копии изображений считались один раз.
+CATEGORY_PICTURES = tuple(
+    f"backend/categories/seed{number}.jpg" for number in range(5)
+)
+PRODUCT_PICTURES = tuple(
+    f"backend/products/seed{number}.jpg" for number in range(10)
+)
+SEED_PASSWORD = "seed-password"
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет БД синтетическим каталогом, пользователями с токенами "
+        "и корзинами для нагрузочного тестирования."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--categories", type=int, default=10)
+        parser.add_argument(
+            "--subcategories", type=int, default=5,
+            help="Подкатегорий в каждой категории.",
+        )
+        parser.add_argument("--products", type=int, default=1000)
+        parser.add_argument(
+            "--images", type=int, default=2,
+            help="Изображений у каждого продукта.",
+        )
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument(
+            "--cart-lines", type=int, default=5,
+            help="Продуктов в корзине каждого пользователя.",
+        )
+        parser.add_argument(
+            "--prefix", default="seed",
+            help="Префикс слагов и имен пользователей.",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0,
+            help="Начальное значение генератора случайных чисел.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=CATALOG_IO_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        if (
+            Category.objects.filter(slug__startswith=f"{prefix}-").exists()
+            or User.objects.filter(
+                username__startswith=f"{prefix}-"
+            ).exists()
+        ):
+            raise CommandError(
+                f"Данные с префиксом {prefix!r} уже есть, "
+                "укажите другой --prefix."
+            )
+        if options["cart_lines"] > options["products"]:
+            raise CommandError(
+                "--cart-lines не может быть больше --products."
+            )
+        self.random = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        throughput = Throughput()
+        with transaction.atomic(using=router.db_for_write(Product)):
+            subcategories = self.create_subcategories(
+                prefix, options["categories"], options["subcategories"]
+            )
+            products = self.create_products(
+                prefix, subcategories, options["products"],
+                options["images"],
+            )
+            users = self.create_users(prefix, options["users"])
+            self.create_carts(users, products, options["cart_lines"])
+            # bulk_create не отправляет сигналы: поисковый индекс
+            # и карточки продуктов обновляются явно.
+            seeded = Product.objects.filter(slug__startswith=f"{prefix}-p")
+            get_search_backend(router.db_for_write(Product)).index(
+                seeded.only("id", "name").iterator(
+                    chunk_size=SEARCH_REBUILD_CHUNK_SIZE
+                )
+            )
+            products_updated.send(sender=Product, products=seeded)
+        bump_catalog_version()
+        throughput.rows = (
+            options["categories"] + len(subcategories)
+            + len(products) * (1 + options["images"])
+            + len(users) * (2 + options["cart_lines"])
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Создано {throughput}: категорий {options['categories']}, "
+            f"подкатегорий {len(subcategories)}, продуктов {len(products)}, "
+            f"пользователей {len(users)} (пароль {SEED_PASSWORD!r}), "
+            f"строк корзины {len(users) * options['cart_lines']}."
+        ))
+
+    def bulk_create(self, model, objects):
+        return model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+    def create_subcategories(self, prefix, categories_count, per_category):
+        categories = self.bulk_create(Category, [
+            Category(
+                name=f"{CATEGORY_NAMES[number % len(CATEGORY_NAMES)]} "
+                     f"{number + 1}",
+                slug=f"{prefix}-c{number}",
+                picture=self.random.choice(CATEGORY_PICTURES),
+            )
+            for number in range(categories_count)
+        ])
+        return [
+            subcategory.id for subcategory in self.bulk_create(Subcategory, [
+                Subcategory(
+                    category=category,
+                    name=self.random.choice(SUBCATEGORY_NAMES),
+                    slug=f"{prefix}-s{category.id}-{number}",
+                    picture=self.random.choice(CATEGORY_PICTURES),
+                )
+                for category in categories
+                for number in range(per_category)
+            ])
+        ]
+
+    def create_products(self, prefix, subcategories, count, images):
+        """Продукты и их изображения пачками, возвращает id продуктов."""
+        if count and not subcategories:
+            raise CommandError("Для продуктов нужна хотя бы одна категория.")
+        ids = []
+        for start in range(0, count, self.batch_size):
+            products = self.bulk_create(Product, [
+                Product(
+                    subcategory_id=self.random.choice(subcategories),
+                    name=f"{self.random.choice(PRODUCT_ADJECTIVES)} "
+                         f"{self.random.choice(PRODUCT_NOUNS)} {number}",
+                    slug=f"{prefix}-p{number}",
+                    price=self.random.randint(
+                        MIN_VALUE_VALIDATOR_PRICE,
+                        min(MAX_VALUE_VALIDATOR_PRICE, 10000),
+                    ),
+                    stock=self.random.randint(0, 100),
+                )
+                for number in range(
+                    start, min(start + self.batch_size, count)
+                )
+            ])
+            self.bulk_create(ImageProduct, [
+                ImageProduct(
+                    product=product,
+                    image=self.random.choice(PRODUCT_PICTURES),
+                    status=ImageProduct.Status.READY,
+                )
+                for product in products
+                for _ in range(images)
+            ])
+            ids.extend(product.id for product in products)
+        return ids
+
+    def create_users(self, prefix, count):
+        password = make_password(SEED_PASSWORD)
+        users = self.bulk_create(User, [
+            User(
+                username=f"{prefix}-user{number}",
+                email=f"{prefix}-user{number}@example.com",
+                password=password,
+            )
+            for number in range(count)
+        ])
+        self.bulk_create(Token, [
+            Token(user=user, key=Token.generate_key()) for user in users
+        ])
+        return [user.id for user in users]
+
+    def create_carts(self, users, products, lines):
+        cart = []
+        for user in users:
+            for product in self.random.sample(products, lines):
+                cart.append(ShoppingCart(
+                    user_id=user,
+                    product_id=product,
+                    amount=self.random.randint(
+                        1, min(MAX_VALUE_VALIDATOR_AMOUNT, 5)
+                    ),
+                ))
+            if len(cart) >= self.batch_size:
+                self.bulk_create(ShoppingCart, cart)
+                cart = []
+        self.bulk_create(ShoppingCart, cart)
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.16 on 2026-10-18 07:02
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+from backend.constants import MAX_VALUE_VALIDATOR_AMOUNT
+
+
+def merge_duplicate_shopping_carts(apps, schema_editor):
+    """Объединение повторяющихся продуктов в корзине перед ограничением."""
+    ShoppingCart = apps.get_model("shop", "ShoppingCart")
+    duplicates = ShoppingCart.objects.values("user", "product").annotate(
+        rows=Count("id"), first_id=Min("id"), total_amount=Sum("amount")
+    ).filter(rows__gt=1)
+    for duplicate in duplicates:
+        ShoppingCart.objects.filter(
+            user=duplicate["user"], product=duplicate["product"]
+        ).exclude(id=duplicate["first_id"]).delete()
+        ShoppingCart.objects.filter(id=duplicate["first_id"]).update(
+            amount=min(duplicate["total_amount"], MAX_VALUE_VALIDATOR_AMOUNT)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_shopping_carts, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='shoppingcart',
+            constraint=models.UniqueConstraint(fields=('user', 'product'), name='unique_shopping_cart_user_product'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.16 on 2026-10-18 07:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0002_shoppingcart_unique_shopping_cart_user_product'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='subcategory',
+            field=models.ForeignKey(db_index=False, help_text='К какой подкатегории относится продукт', on_delete=django.db.models.deletion.CASCADE, to='shop.subcategory', verbose_name='Подкатегория продукта'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['subcategory', 'price'], name='product_subcategory_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['price', 'id'], name='product_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['name', 'id'], name='product_name_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS shop_product_fts "
+            "USING fts5(name, tokenize='unicode61 remove_diacritics 2')"
+        )
+        Product = apps.get_model("shop", "Product")
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(
+                "INSERT INTO shop_product_fts (rowid, name) VALUES (%s, %s)",
+                [
+                    (pk, name.lower().replace("ё", "е"))
+                    for pk, name in Product.objects.values_list("id", "name")
+                ],
+            )
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS product_name_search_idx "
+            "ON shop_product USING GIN "
+            "(to_tsvector('simple', translate(name, 'ёЁ', 'еЕ')))"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS shop_product_fts")
+    elif vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS product_name_search_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0003_product_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.16 on 2026-10-18 07:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0004_product_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imageproduct',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Обрабатывается'), ('ready', 'Готово'), ('failed', 'Ошибка обработки')], default='ready', help_text='Статус фоновой обработки изображения', max_length=16, verbose_name='Статус'),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='imageproduct',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Обрабатывается'), ('ready', 'Готово'), ('failed', 'Ошибка обработки')], default='pending', help_text='Статус фоновой обработки изображения', max_length=16, verbose_name='Статус'),
+        ),
+        migrations.CreateModel(
+            name='BackgroundTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Имя зарегистрированной фоновой задачи', max_length=64, verbose_name='Задача')),
+                ('args', models.JSONField(default=list, help_text='Аргументы задачи', verbose_name='Аргументы')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Выполняется'), ('failed', 'Ошибка')], default='pending', max_length=16, verbose_name='Статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попытки')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создана')),
+            ],
+            options={
+                'verbose_name': 'Фоновая задача',
+                'verbose_name_plural': 'фоновые задачи',
+                'indexes': [models.Index(fields=['status', 'id'], name='background_task_status_idx')],
+            },
+        ),
+    ]
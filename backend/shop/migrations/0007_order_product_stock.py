@@ -0,0 +1,52 @@
+# Generated by Django 4.2.16 on 2026-10-18 07:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('shop', '0006_product_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Order',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_price', models.PositiveBigIntegerField(help_text='Общая цена продуктов на момент заказа', verbose_name='Сумма')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создан')),
+                ('user', models.ForeignKey(help_text='Пользователь, оформивший заказ.', on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Заказ',
+                'verbose_name_plural': 'заказы',
+            },
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='stock',
+            field=models.PositiveIntegerField(default=0, help_text='Количество продукта, доступное для заказа', verbose_name='Остаток'),
+        ),
+        migrations.CreateModel(
+            name='OrderItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.PositiveIntegerField(help_text='Цена продукта на момент заказа', verbose_name='Цена')),
+                ('amount', models.PositiveSmallIntegerField(help_text='Количество продуктов', verbose_name='Количество')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='shop.order', verbose_name='Заказ')),
+                ('product', models.ForeignKey(help_text='Заказанный продукт.', on_delete=django.db.models.deletion.PROTECT, to='shop.product', verbose_name='Продукт')),
+            ],
+            options={
+                'verbose_name': 'Продукт в заказе',
+                'verbose_name_plural': 'продукты в заказе',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='orderitem',
+            constraint=models.UniqueConstraint(fields=('order', 'product'), name='unique_order_item_order_product'),
+        ),
+    ]
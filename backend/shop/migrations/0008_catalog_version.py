@@ -0,0 +1,33 @@
+# Generated by Django 4.2.16 on 2026-10-18 08:01
+
+from django.db import migrations, models
+
+
+def create_catalog_version(apps, schema_editor):
+    """Единственная запись версии, которую затем только обновляют."""
+    CatalogVersion = apps.get_model("shop", "CatalogVersion")
+    CatalogVersion.objects.using(schema_editor.connection.alias).create()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0007_order_product_stock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(default=0, verbose_name='Версия')),
+            ],
+            options={
+                'verbose_name': 'Версия каталога',
+                'verbose_name_plural': 'версии каталога',
+            },
+        ),
+        migrations.RunPython(
+            create_catalog_version, migrations.RunPython.noop
+        ),
+    ]
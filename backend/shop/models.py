@@ -3,6 +3,7 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
 
 from backend.constants import (
+    BACKGROUND_TASK_NAME_MAX_LENGTH,
     CATEGORY_NAME_MAX_LENGTH,
     MAX_VALUE_VALIDATOR_AMOUNT,
     MAX_VALUE_VALIDATOR_PRICE,
@@ -10,6 +11,7 @@ from backend.constants import (
     MIN_VALUE_VALIDATOR_PRICE,
     PRODUCT_NAME_FIELD_MAX_LENGTH,
     PRODUCT_SLUG_FIELD_MAX_LENGTH,
+    STATUS_FIELD_MAX_LENGTH,
     TAG_CATEGORY_FIELD_MAX_LENGTH,
 )
 
@@ -89,6 +91,7 @@ class Product(models.Model):
         on_delete=models.CASCADE,
         verbose_name="Подкатегория продукта",
         help_text="К какой подкатегории относится продукт",
+        db_index=False,
     )
     name = models.CharField(
         "Название",
@@ -119,6 +122,16 @@ class Product(models.Model):
             ),
         ],
     )
+    stock = models.PositiveIntegerField(
+        "Остаток",
+        default=0,
+        help_text="Количество продукта, доступное для заказа",
+    )
+    updated_at = models.DateTimeField(
+        "Изменен",
+        auto_now=True,
+        help_text="Время последнего изменения продукта",
+    )
 
     def __str__(self):
         return self.name
@@ -126,11 +139,27 @@ class Product(models.Model):
     class Meta:
         verbose_name = "Продукт"
         verbose_name_plural = "продукты"
+        indexes = (
+            models.Index(
+                fields=("subcategory", "price"),
+                name="product_subcategory_price_idx",
+            ),
+            models.Index(fields=("price", "id"), name="product_price_idx"),
+            models.Index(fields=("name", "id"), name="product_name_idx"),
+            models.Index(
+                fields=("updated_at", "id"), name="product_updated_at_idx"
+            ),
+        )
 
 
 class ImageProduct(models.Model):
     """Модель изображений связанных с продуктами."""
 
+    class Status(models.TextChoices):
+        PENDING = "pending", "Обрабатывается"
+        READY = "ready", "Готово"
+        FAILED = "failed", "Ошибка обработки"
+
     product = models.ForeignKey(
         Product, on_delete=models.CASCADE, verbose_name="Продукт"
     )
@@ -139,10 +168,24 @@ class ImageProduct(models.Model):
         verbose_name="Изображение",
         help_text="Изображение продукта",
     )
+    status = models.CharField(
+        "Статус",
+        max_length=STATUS_FIELD_MAX_LENGTH,
+        choices=Status.choices,
+        default=Status.PENDING,
+        help_text="Статус фоновой обработки изображения",
+    )
 
     def __str__(self):
         return f'id {self.product.id}, {self.product.name} изображение'
 
+    @property
+    def processed_image(self):
+        """Изображение, если его обработка завершена."""
+        if self.status == self.Status.READY:
+            return self.image
+        return None
+
     class Meta:
         verbose_name = "Изображение продукта"
         verbose_name_plural = "изображения продукта"
@@ -180,3 +223,125 @@ class ShoppingCart(models.Model):
         ],
         default=1,
     )
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=("user", "product"),
+                name="unique_shopping_cart_user_product",
+            ),
+        )
+
+
+class Order(models.Model):
+    """Модель заказа."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name="Пользователь",
+        help_text="Пользователь, оформивший заказ.",
+    )
+    total_price = models.PositiveBigIntegerField(
+        "Сумма",
+        help_text="Общая цена продуктов на момент заказа",
+    )
+    created_at = models.DateTimeField("Создан", auto_now_add=True)
+
+    def __str__(self):
+        return f"Заказ {self.id}"
+
+    class Meta:
+        verbose_name = "Заказ"
+        verbose_name_plural = "заказы"
+
+
+class OrderItem(models.Model):
+    """Модель продукта в заказе."""
+
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name="items",
+        verbose_name="Заказ",
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.PROTECT,
+        verbose_name="Продукт",
+        help_text="Заказанный продукт.",
+    )
+    price = models.PositiveIntegerField(
+        "Цена",
+        help_text="Цена продукта на момент заказа",
+    )
+    amount = models.PositiveSmallIntegerField(
+        "Количество",
+        help_text="Количество продуктов",
+    )
+
+    class Meta:
+        verbose_name = "Продукт в заказе"
+        verbose_name_plural = "продукты в заказе"
+        constraints = (
+            models.UniqueConstraint(
+                fields=("order", "product"),
+                name="unique_order_item_order_product",
+            ),
+        )
+
+
+class BackgroundTask(models.Model):
+    """Модель очереди фоновых задач."""
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "В очереди"
+        RUNNING = "running", "Выполняется"
+        FAILED = "failed", "Ошибка"
+
+    name = models.CharField(
+        "Задача",
+        max_length=BACKGROUND_TASK_NAME_MAX_LENGTH,
+        help_text="Имя зарегистрированной фоновой задачи",
+    )
+    args = models.JSONField(
+        "Аргументы", default=list, help_text="Аргументы задачи"
+    )
+    status = models.CharField(
+        "Статус",
+        max_length=STATUS_FIELD_MAX_LENGTH,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField("Попытки", default=0)
+    error = models.TextField("Ошибка", blank=True)
+    created_at = models.DateTimeField("Создана", auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name}{tuple(self.args)}"
+
+    class Meta:
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "фоновые задачи"
+        indexes = (
+            models.Index(
+                fields=("status", "id"), name="background_task_status_idx"
+            ),
+        )
+
+
+class CatalogVersion(models.Model):
+    """
+    Версия каталога в БД, одна запись. Она обновляется после фиксации
+    изменений каталога, поэтому реплика с этой версией уже получила
+    и сами изменения.
+    """
+
+    version = models.BigIntegerField("Версия", default=0)
+
+    def __str__(self):
+        return str(self.version)
+
+    class Meta:
+        verbose_name = "Версия каталога"
+        verbose_name_plural = "версии каталога"
@@ -0,0 +1,142 @@
+import re
+
+from django.db import connections, router
+
+from backend.constants import SEARCH_MAX_TERMS, SEARCH_REBUILD_CHUNK_SIZE
+from .models import Product
+
+
+SEARCH_TERM_PATTERN = re.compile(r"\w+")
+
+
+def normalize_search_text(text):
+    """Приведение текста к нижнему регистру с заменой ё на е."""
+    return text.lower().replace("ё", "е")
+
+
+def get_search_terms(query):
+    """Слова поискового запроса после нормализации."""
+    return SEARCH_TERM_PATTERN.findall(
+        normalize_search_text(query)
+    )[:SEARCH_MAX_TERMS]
+
+
+class BaseSearchBackend:
+    """
+    Общий интерфейс поиска продуктов по названию.
+
+    search возвращает id продуктов в порядке релевантности, последнее
+    слово запроса ищется по префиксу для автодополнения.
+    """
+
+    def __init__(self, using):
+        self.using = using
+
+    def search(self, query, limit):
+        raise NotImplementedError
+
+    def index(self, products):
+        """Добавление или обновление продуктов в индексе."""
+
+    def remove(self, product_ids):
+        """Удаление продуктов из индекса."""
+
+    def rebuild(self):
+        """Полное перестроение индекса."""
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """Поиск через LIKE для СУБД без полнотекстового индекса."""
+
+    def search(self, query, limit):
+        queryset = Product.objects.using(self.using)
+        for term in get_search_terms(query):
+            queryset = queryset.filter(name__icontains=term)
+        return list(
+            queryset.order_by("name", "id").values_list("id", flat=True)[
+                :limit
+            ]
+        )
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """Поиск по виртуальной таблице FTS5, обновляемой сигналами."""
+
+    table = "shop_product_fts"
+
+    def search(self, query, limit):
+        terms = get_search_terms(query)
+        if not terms:
+            return []
+        match = " ".join(f'"{term}"*' for term in terms)
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {self.table} WHERE {self.table} "
+                "MATCH %s ORDER BY rank LIMIT %s",
+                (match, limit),
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def index(self, products):
+        with connections[self.using].cursor() as cursor:
+            cursor.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (rowid, name) "
+                "VALUES (%s, %s)",
+                [
+                    (product.id, normalize_search_text(product.name))
+                    for product in products
+                ],
+            )
+
+    def remove(self, product_ids):
+        with connections[self.using].cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {self.table} WHERE rowid = %s",
+                [(product_id,) for product_id in product_ids],
+            )
+
+    def rebuild(self):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+        self.index(
+            Product.objects.using(self.using).only("id", "name").iterator(
+                chunk_size=SEARCH_REBUILD_CHUNK_SIZE
+            )
+        )
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Поиск по tsvector названия. GIN-индекс по выражению
+    обновляется самой СУБД, отдельная синхронизация не нужна.
+    """
+
+    document = "to_tsvector('simple', translate(name, 'ёЁ', 'еЕ'))"
+
+    def search(self, query, limit):
+        terms = get_search_terms(query)
+        if not terms:
+            return []
+        ts_query = " & ".join(f"{term}:*" for term in terms)
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f"SELECT id FROM shop_product WHERE {self.document} "
+                "@@ to_tsquery('simple', %s) "
+                f"ORDER BY ts_rank({self.document}, "
+                "to_tsquery('simple', %s)) DESC, id LIMIT %s",
+                (ts_query, ts_query, limit),
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+SEARCH_BACKENDS = {
+    "sqlite": SQLiteSearchBackend,
+    "postgresql": PostgresSearchBackend,
+}
+
+
+def get_search_backend(using=None):
+    """Бэкенд поиска для СУБД, в которой хранятся продукты."""
+    using = using or router.db_for_read(Product)
+    vendor = connections[using].vendor
+    return SEARCH_BACKENDS.get(vendor, DatabaseSearchBackend)(using)
@@ -0,0 +1,87 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .cache import bump_catalog_version
+from .models import Category, ImageProduct, Product, Subcategory
+from .search import get_search_backend
+from .tasks import enqueue
+
+
+CATALOG_MODELS = (Category, Subcategory, Product, ImageProduct)
+IMAGE_FIELDS = {Category: "picture", Subcategory: "picture",
+                ImageProduct: "image"}
+
+# Массовое изменение продуктов в обход save(), например при импорте
+# каталога. Аргумент products - queryset измененных продуктов.
+products_updated = Signal()
+
+
+def catalog_changed(sender, using, **kwargs):
+    """
+    Смена версии каталога при изменении категорий и продуктов.
+    Версия меняется после фиксации транзакции, чтобы ответ со старыми
+    данными не попал в кеш под новой версией.
+    """
+    transaction.on_commit(bump_catalog_version, using=using)
+
+
+def mark_uploaded_image(sender, instance, **kwargs):
+    """
+    Новый файл еще не записан в хранилище: такое изображение
+    отправляется на фоновую обработку после сохранения.
+    """
+    field_file = getattr(instance, IMAGE_FIELDS[sender])
+    instance._image_uploaded = bool(field_file) and not field_file._committed
+    if instance._image_uploaded and sender is ImageProduct:
+        instance.status = ImageProduct.Status.PENDING
+
+
+def process_uploaded_image(sender, instance, **kwargs):
+    if not getattr(instance, "_image_uploaded", False):
+        return
+    if sender is ImageProduct:
+        enqueue("process_product_image", instance.id)
+    else:
+        enqueue("create_image_variants", sender._meta.label, instance.pk)
+
+
+def touch_products(sender, instance, **kwargs):
+    """
+    Обновление времени изменения продуктов, чьи данные в выгрузке
+    зависят от изменившейся категории, подкатегории или изображения.
+    """
+    if sender is ImageProduct:
+        products = Product.objects.filter(id=instance.product_id)
+    elif sender is Subcategory:
+        products = Product.objects.filter(subcategory=instance)
+    else:
+        products = Product.objects.filter(subcategory__category=instance)
+    products.update(updated_at=timezone.now())
+
+
+def index_product(sender, instance, using, update_fields=None, **kwargs):
+    """Обновление поискового индекса при изменении названия продукта."""
+    if update_fields is None or "name" in update_fields:
+        get_search_backend(using).index((instance,))
+
+
+def unindex_product(sender, instance, using, **kwargs):
+    get_search_backend(using).remove((instance.id,))
+
+
+for model in CATALOG_MODELS:
+    post_save.connect(catalog_changed, sender=model)
+    post_delete.connect(catalog_changed, sender=model)
+
+for model in IMAGE_FIELDS:
+    pre_save.connect(mark_uploaded_image, sender=model)
+    post_save.connect(process_uploaded_image, sender=model)
+
+for model in (Category, Subcategory, ImageProduct):
+    post_save.connect(touch_products, sender=model)
+post_delete.connect(touch_products, sender=ImageProduct)
+
+post_save.connect(index_product, sender=Product)
+post_delete.connect(unindex_product, sender=Product)
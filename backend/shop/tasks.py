@@ -0,0 +1,202 @@
+import logging
+import multiprocessing
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from PIL import Image, ImageOps
+
+from backend.constants import (
+    BACKGROUND_TASK_MAX_ATTEMPTS,
+    IMAGE_MAX_DIMENSION,
+    IMAGE_VARIANT_QUALITY,
+)
+from .cache import bump_catalog_version, forget_catalog_version
+from .images import get_image_variants
+from .models import BackgroundTask, ImageProduct, Product, Subcategory
+
+
+logger = logging.getLogger(__name__)
+
+REENCODED_FORMATS = ("JPEG", "PNG", "WEBP")
+
+
+def process_product_image(image_id):
+    """
+    Обработка загруженного изображения продукта: декодирование,
+    уменьшение до IMAGE_MAX_DIMENSION, удаление EXIF, перекодирование
+    и создание уменьшенных копий. После нее изображение готово к выдаче.
+    """
+    image = ImageProduct.objects.filter(id=image_id).first()
+    if image is None:
+        return
+    try:
+        old_name = image.image.name
+        with image.image.open("rb"), Image.open(image.image) as original:
+            image_format = original.format
+            if image_format not in REENCODED_FORMATS:
+                image_format = "PNG"
+            processed = ImageOps.exif_transpose(original)
+            processed.thumbnail((IMAGE_MAX_DIMENSION, IMAGE_MAX_DIMENSION))
+            if image_format == "JPEG" and processed.mode != "RGB":
+                processed = processed.convert("RGB")
+            buffer = BytesIO()
+            processed.save(buffer, image_format, quality=IMAGE_VARIANT_QUALITY)
+        image.image.save(
+            os.path.basename(old_name), ContentFile(buffer.getvalue()),
+            save=False,
+        )
+        image.image.storage.delete(old_name)
+        get_image_variants(image.image)
+    except Exception:
+        ImageProduct.objects.filter(id=image_id).update(
+            status=ImageProduct.Status.FAILED
+        )
+        raise
+    image.status = ImageProduct.Status.READY
+    image.save(update_fields=("image", "status"))
+
+
+def create_image_variants(model_label, pk):
+    """
+    Создание уменьшенных копий изображения категории/подкатегории
+    и пересборка карточек продуктов, в которые копии попадают.
+    """
+    # Сигналы импортируют задачи, поэтому импорт внутри функции.
+    from .signals import products_updated
+
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+    get_image_variants(instance.picture)
+    if model is Subcategory:
+        products = Product.objects.filter(subcategory=instance)
+    else:
+        products = Product.objects.filter(subcategory__category=instance)
+    products_updated.send(sender=Product, products=products)
+    bump_catalog_version()
+
+
+TASKS = {
+    "process_product_image": process_product_image,
+    "create_image_variants": create_image_variants,
+}
+
+
+def run_task(name, args):
+    """Выполнение зарегистрированной задачи в текущем процессе."""
+    close_old_connections()
+    try:
+        TASKS[name](*args)
+    finally:
+        close_old_connections()
+
+
+def init_worker_process():
+    import django
+
+    django.setup()
+
+
+_executor = None
+
+
+def get_executor():
+    """Пул процессов создается при первой задаче и живет до выхода."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.BACKGROUND_TASKS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker_process,
+        )
+    return _executor
+
+
+def finish_task(future):
+    """
+    Задача в пуле процессов меняет каталог в другом процессе: после нее
+    версия каталога перечитывается из БД, чтобы ответы процесса,
+    поставившего задачу, сразу учли изменения.
+    """
+    forget_catalog_version()
+    if future.exception() is not None:
+        logger.error(
+            "Фоновая задача завершилась ошибкой",
+            exc_info=future.exception(),
+        )
+
+
+def enqueue(name, *args):
+    """
+    Постановка задачи после фиксации текущей транзакции.
+
+    BACKGROUND_TASKS_BACKEND выбирает способ выполнения: process -
+    пул процессов внутри приложения, database - таблица задач,
+    которую разбирает manage.py run_background_tasks, sync - сразу
+    в текущем потоке.
+    """
+    if name not in TASKS:
+        raise KeyError(f"Неизвестная фоновая задача: {name}")
+    backend = settings.BACKGROUND_TASKS_BACKEND
+
+    def submit():
+        if backend == "database":
+            BackgroundTask.objects.create(name=name, args=list(args))
+        elif backend == "process":
+            get_executor().submit(run_task, name, args).add_done_callback(
+                finish_task
+            )
+        else:
+            try:
+                TASKS[name](*args)
+            except Exception:
+                logger.exception("Фоновая задача %s завершилась ошибкой", name)
+
+    transaction.on_commit(submit)
+
+
+def claim_tasks(limit):
+    """
+    Захват задач из очереди. Условное обновление статуса гарантирует,
+    что одну задачу не выполнят два обработчика одновременно.
+    """
+    claimed = []
+    pending = BackgroundTask.objects.filter(
+        status=BackgroundTask.Status.PENDING
+    ).order_by("id").values_list("id", flat=True)[:limit]
+    for task_id in pending:
+        if BackgroundTask.objects.filter(
+            id=task_id, status=BackgroundTask.Status.PENDING
+        ).update(
+            status=BackgroundTask.Status.RUNNING, attempts=F("attempts") + 1
+        ):
+            claimed.append(task_id)
+    return BackgroundTask.objects.filter(id__in=claimed).order_by("id")
+
+
+def run_database_tasks(limit):
+    """Выполнение пачки задач из таблицы. Возвращает их количество."""
+    tasks = list(claim_tasks(limit))
+    for task in tasks:
+        try:
+            TASKS[task.name](*task.args)
+        except Exception:
+            task.status = (
+                BackgroundTask.Status.FAILED
+                if task.attempts >= BACKGROUND_TASK_MAX_ATTEMPTS
+                else BackgroundTask.Status.PENDING
+            )
+            task.error = traceback.format_exc()
+            task.save(update_fields=("status", "error"))
+            logger.exception("Фоновая задача %s завершилась ошибкой", task)
+        else:
+            task.delete()
+    return len(tasks)